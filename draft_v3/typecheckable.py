@@ -4,6 +4,8 @@
 import abc
 import six
 
+from funkyvalidate.onefile import CheckerMeta
+
 def _hasattr(C, attr):
     try:
         return any(attr in B.__dict__ for B in C.__mro__)
@@ -24,7 +26,7 @@ class abstractclassmethod(classmethod):
         callable.__isabstractmethod__ = True
         super(abstractclassmethod, self).__init__(callable)
 
-class TypeCheckableMeta(abc.ABCMeta):
+class TypeCheckableMeta(CheckerMeta):
     """
     Classes inheriting from ValueABC should be used for type hinting,
     annotations, and sometimes type-checking.
@@ -43,22 +45,6 @@ class TypeCheckableMeta(abc.ABCMeta):
     @todo: Determine: Will ValueABC.__instancecheck__ classmethod will disrupt the ValueMeta.__instancecheck__ ?
     """
 
-    def __instancecheck__(cls, instance):
-        if _hasattr(cls, '__instancecheck__'):
-            #if (cls.__instancecheck__ == ValueMeta.__instancecheck__):
-            return cls.__instancecheck__(instance)
-        else:
-            return abc.ABCMeta.__instancecheck__(cls, instance)
-
-    def __subclasscheck__(cls, subclass):
-        if _hasattr(cls, '__subclasscheck__'):
-            return cls.__subclasscheck__(subclass)
-        else:
-            return abc.ABCMeta.__subclasscheck__(cls, subclass)
-
-
-
-
 
 @six.add_metaclass(TypeCheckableMeta)
 class TypeCheckable(object):
@@ -1,4 +1,49 @@
 """
+The names of funkyvalidate.onefile, loaded on first use: importing the
+package itself does not import onefile, so short-lived programs which
+never validate anything do not pay for it.
+
+Python 2 has no module-level __getattr__ (PEP 562), so the package
+module is replaced in sys.modules by a LazyModule, which provides it.
 """
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module whose missing attributes are looked up in `_source`, imported
+    when first needed, and then kept as attributes.
+    """
+    _source = 'funkyvalidate.onefile'
+
+    def __getattr__(self, name):
+        if name.startswith('__') and name != '__all__':
+            raise AttributeError(name)
+        __import__(self._source)
+        source = sys.modules[self._source]
+        if name == '__all__':
+            value = [attr for attr in vars(source) if not attr.startswith('_')]
+        else:
+            try:
+                value = getattr(source, name)
+            except AttributeError:
+                raise AttributeError(str.format(
+                    "module '{0}' has no attribute '{1}'", self.__name__, name
+                ))
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(vars(self)).union(self.__all__))
+
 
-from onefile import *
+_module = LazyModule(__name__, __doc__)
+_module.__dict__.update(
+    (name, value) for name, value in globals().items()
+    if name.startswith('__')
+)
+# Python 2 clears the globals of a module once it is collected, and
+# LazyModule's methods still use these ones
+_module.__dict__['_package'] = sys.modules[__name__]
+sys.modules[__name__] = _module
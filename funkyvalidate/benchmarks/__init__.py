@@ -0,0 +1,175 @@
+"""
+Microbenchmarks of the public check paths, for catching regressions.
+
+    python -m funkyvalidate.benchmarks
+    python -m funkyvalidate.benchmarks --save baseline.json
+    python -m funkyvalidate.benchmarks --compare baseline.json --filter Nested
+
+Each case checks a batch of values - some fraction of them invalid - and
+is timed over several samples, reported as values checked per second,
+with the spread between samples. --compare exits with status 1 if any
+case is slower than its baseline, by more than --tolerance and more than
+the noise of both runs.
+"""
+from __future__ import division
+
+import argparse
+import json
+import math
+import platform
+import sys
+import timeit
+
+
+class Case(object):
+    """
+    A named function, which checks `size` values each time it is called.
+    """
+    __slots__ = ('name', 'function', 'size')
+
+    def __init__(self, name, function, size):
+        """
+        @type: name: str
+        @type: function: Callable[[], Any]
+        @type: size: int
+        """
+        self.name = name
+        self.function = function
+        self.size = size
+
+    def __repr__(self):
+        return str.format("Case({0!r})", self.name)
+
+
+def measure(case, repeat=5, min_time=0.02):
+    """
+    Statistics of the rate of `case`, in values per second, over `repeat`
+    samples. Each sample calls it enough times to take `min_time` seconds.
+    @type: case: Case
+    @type: repeat: int
+    @type: min_time: float
+    @rtype: dict[str, float]
+    """
+    timer = timeit.Timer(case.function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed * 1.2))
+    rates = [number * case.size / elapsed]
+    rates.extend(
+        number * case.size / timer.timeit(number)
+        for _ in range(repeat - 1)
+    )
+    mean = sum(rates) / len(rates)
+    variance = sum((rate - mean) ** 2 for rate in rates) / max(len(rates) - 1, 1)
+    return {
+        'mean': mean,
+        'stdev': math.sqrt(variance),
+        'min': min(rates),
+        'max': max(rates),
+        'samples': len(rates),
+    }
+
+def run(cases, repeat=5, min_time=0.02, output=None):
+    """
+    Measure each of `cases`, writing a line for each to `output`, if given.
+    @type: cases: Iterable[Case]
+    @type: repeat: int
+    @type: min_time: float
+    @type: output: Optional[file]
+    @rtype: dict[str, dict[str, float]]
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = stats = measure(case, repeat, min_time)
+        if output is not None:
+            output.write(str.format(
+                "{0:<56} {1:>14,.0f} ops/s  +- {2:5.1f}%\n",
+                case.name, stats['mean'], _percent(stats['stdev'], stats['mean'])
+            ))
+            output.flush()
+    return results
+
+def compare(baseline, results, tolerance=0.1):
+    """
+    Cases of `results` which are slower than in `baseline`: by more than
+    `tolerance`, as a fraction, and by more than twice their combined
+    standard deviations. Cases missing from either are ignored.
+    @type: baseline: dict[str, dict[str, float]]
+    @type: results: dict[str, dict[str, float]]
+    @type: tolerance: float
+    @rtype: list[tuple[str, float, float]]
+    """
+    regressions = []
+    for name in sorted(set(baseline).intersection(results)):
+        old, new = baseline[name], results[name]
+        drop = old['mean'] - new['mean']
+        if drop > tolerance * old['mean'] and drop > 2 * (old['stdev'] + new['stdev']):
+            regressions.append((name, old['mean'], new['mean']))
+    return regressions
+
+def save(results, path):
+    """
+    @type: results: dict[str, dict[str, float]]
+    @type: path: str
+    """
+    document = {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(path, 'w') as stream:
+        json.dump(document, stream, indent=2, sort_keys=True)
+
+def load(path):
+    """
+    @type: path: str
+    @rtype: dict[str, dict[str, float]]
+    """
+    with open(path) as stream:
+        return json.load(stream)['results']
+
+def main(argv=None):
+    """
+    Command line entry point. Returns the exit status.
+    @type: argv: Optional[list[str]]
+    @rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m funkyvalidate.benchmarks',
+        description="Time funkyvalidate's check paths."
+    )
+    parser.add_argument('--filter', default='',
+                        help="only run cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="samples per case (default: 5)")
+    parser.add_argument('--min-time', type=float, default=0.02,
+                        help="seconds per sample (default: 0.02)")
+    parser.add_argument('--save', metavar='PATH',
+                        help="write the results as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH',
+                        help="compare with a JSON baseline, failing on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="slowdown allowed by --compare, as a fraction (default: 0.1)")
+    arguments = parser.parse_args(argv)
+
+    from funkyvalidate.benchmarks.cases import cases
+    selected = [case for case in cases() if arguments.filter in case.name]
+    results = run(selected, arguments.repeat, arguments.min_time, sys.stdout)
+    if arguments.save:
+        save(results, arguments.save)
+    if arguments.compare:
+        regressions = compare(load(arguments.compare), results, arguments.tolerance)
+        for name, old, new in regressions:
+            sys.stdout.write(str.format(
+                "REGRESSION {0}: {1:,.0f} --> {2:,.0f} ops/s ({3:+.1f}%)\n",
+                name, old, new, _percent(new - old, old)
+            ))
+        if regressions:
+            return 1
+    return 0
+
+def _percent(part, whole):
+    return 100.0 * part / whole if whole else 0.0
@@ -0,0 +1,6 @@
+import sys
+
+from funkyvalidate.benchmarks import main
+
+
+sys.exit(main())
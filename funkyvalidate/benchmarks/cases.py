@@ -0,0 +1,111 @@
+"""
+The benchmark cases: each operation, against each spec, over batches of
+several sizes and fractions of invalid values.
+
+Case names read 'operation spec size=N invalid=P%'.
+"""
+import abc
+import os
+
+from funkyvalidate import (
+    validate, is_valid, type_check, meets, ValidationError,
+    Any, Union, Optional, Tuple, Nested, InterfaceType
+)
+from funkyvalidate.examples.examples import PositiveInteger
+from funkyvalidate.examples.existing_file import ExistingFile
+from funkyvalidate.benchmarks import Case
+
+
+SIZES = (10, 1000)
+INVALID_FRACTIONS = (0.0, 0.5)
+# Length of the lists checked against Nested
+NESTED_LENGTH = 100
+
+
+class Named(InterfaceType):
+    name = abc.abstractproperty()
+
+class Person(object):
+    def __init__(self, name):
+        self.name = name
+
+class Anonymous(object):
+    pass
+
+
+_existing = os.path.abspath(__file__)
+_missing = os.path.join(os.path.dirname(_existing), 'missing.txt')
+
+# label, spec, valid(i), invalid(i) - None for specs which accept anything
+SPECS = [
+    ('Any', Any, lambda i: i, None),
+    ('Union', Union(int, str), lambda i: i, lambda i: float(i)),
+    ('Optional', Optional(str), lambda i: None if i % 2 else 'a', lambda i: i),
+    ('Tuple', Tuple(str, int), lambda i: ('a', i), lambda i: ('a', 'b')),
+    ('Nested', Nested(list, int),
+     lambda i: list(range(NESTED_LENGTH)),
+     lambda i: list(range(NESTED_LENGTH - 1)) + ['x']),
+    ('InterfaceType', Named, lambda i: Person('a'), lambda i: Anonymous()),
+    ('ExistingFile', ExistingFile, lambda i: _existing, lambda i: _missing),
+    ('PositiveInteger', PositiveInteger, lambda i: i + 1, lambda i: -i),
+]
+
+
+def cases():
+    """
+    @rtype: list[Case]
+    """
+    result = []
+    for label, spec, valid, invalid in SPECS:
+        operations = [
+            ('validate', _validate(spec)),
+            ('is_valid', lambda value, spec=spec: is_valid(value, spec)),
+            ('type_check', _type_check(spec)),
+            ('isinstance', lambda value, spec=spec: isinstance(value, spec)),
+        ]
+        if label == 'InterfaceType':
+            operations.append(('meets', lambda value, spec=spec: meets(value, spec)))
+        fractions = INVALID_FRACTIONS if invalid is not None else (0.0, )
+        for size in SIZES:
+            for fraction in fractions:
+                values = _batch(valid, invalid, size, fraction)
+                for operation, check in operations:
+                    name = str.format(
+                        "{0} {1} size={2} invalid={3:.0%}",
+                        operation, label, size, fraction
+                    )
+                    result.append(Case(name, _over(check, values), size))
+    return result
+
+def _batch(valid, invalid, size, fraction):
+    """
+    `size` values, with invalid ones spread evenly through them.
+    @rtype: list
+    """
+    every = int(round(1 / fraction)) if fraction else 0
+    return [
+        invalid(i) if every and i % every == 0 else valid(i)
+        for i in range(size)
+    ]
+
+def _over(check, values):
+    def run():
+        for value in values:
+            check(value)
+    return run
+
+def _validate(spec):
+    def check(value):
+        try:
+            validate(value, spec)
+        except (ValidationError, IOError):
+            pass
+    return check
+
+def _type_check(spec):
+    def check(value):
+        try:
+            type_check(value, spec, 'value')
+        except ValidationError:
+            pass
+    return check
@@ -24,9 +24,14 @@ TypeSpec = Union(type, Sequence[type])
 """
 import abc
 from collections import Iterator, Mapping, Sequence
+import itertools
+import timeit
 import six
 
-from onefile import ValueABC
+from onefile import ValueABC, ValidationError, Failure, compile, intern_spec
+from onefile import check as _check, check_many as _check_many
+from onefile import check_all as _check_all, collect_failures, MappingKey
+from onefile import as_sample, active_recorder
 
 
 class Nested(ValueABC):
@@ -76,11 +81,74 @@ def validate(value, category, name='object', sequence=None, iterator=None, mappi
     return result
 
 def is_valid(value, category, **keywords):
-    try:
-        validate(value, category, **keywords)
-    except ValidationError:
-        return False
-    return True
+    return check(value, category, **keywords) is None
+
+def check(value, category, name='object', sequence=None, iterator=None, mapping=None):
+    """
+    Non-raising parallel of validate(). Returns None if `value` is valid,
+    and otherwise a Failure, which only builds its message if asked.
+    @rtype: Optional[Failure]
+    """
+    failure = check_atomic(value, category=category, name=name)
+
+    if failure is None and sequence is not None:
+        failure = check_sequence(value, sequence, name=name)
+
+    if failure is None and iterator is not None:
+        failure = check_type(value, Iterator, name)
+
+    if failure is None and mapping is not None:
+        failure = check_mapping(value, mapping, name=name)
+
+    return failure
+
+def check_all(value, category, name='object', sequence=None, iterator=None, mapping=None):
+    """
+    Collect-all-errors parallel of check(). Returns every Failure, in order,
+    each with the `path` of indexes and keys (MappingKey, for invalid keys)
+    from `value` to the value at fault. Names are only formatted if asked.
+    @rtype: list[Failure]
+    """
+    failures = _check_all(value, category, name)
+
+    if sequence is not None:
+        failure = check_type(value, Sequence, name)
+        if failure is not None:
+            failures.append(failure)
+        elif not compile(sequence).test_many(value):
+            failures.extend(collect_failures(sequence, enumerate(value), name))
+
+    if iterator is not None:
+        failure = check_type(value, Iterator, name)
+        if failure is not None:
+            failures.append(failure)
+
+    if mapping is not None:
+        failures.extend(_mapping_failures(value, mapping, name))
+
+    return failures
+
+def _mapping_failures(mapping, category, name):
+    """
+    @type: mapping: Mapping
+    @type: category: Sequence[TypeSpec]
+    @type: name: str
+    @rtype: list[Failure]
+    """
+    failure = check_mapping_category(mapping, category)
+    if failure is not None:
+        return [failure]
+    keys_type, values_type = category
+    keys_plan, values_plan = compile(keys_type), compile(values_type)
+    failures = []
+    if not keys_plan.test_many(mapping):
+        failures.extend(
+            keys_plan.check(key, name, (MappingKey(key), ))
+            for key in mapping if not keys_plan.test(key)
+        )
+    if not values_plan.test_many(mapping.values()):
+        failures.extend(collect_failures(values_type, six.iteritems(mapping), name))
+    return failures
 
 
 def validate_atomic(value, category=None, name="object"):
@@ -92,22 +160,17 @@ def validate_atomic(value, category=None, name="object"):
     @type: name: Optional[str]
     @rtype: Any
     """
-    if hasattr(category, 'validate'):
-        result = category.__validate__(value)
-    elif isinstance(category, type):
-        result = type_check(value, category, name)
-    elif category is None:  # Should this be here?
-        result = value
-    elif isinstance(category, tuple):
-        # A tuple of types. Ex. isinstance(myvar, (NoneType, str))
-        for i, elm in enumerate(category):
-            validate(elm, type, name="{0}[{1}]".format(name, i))
-        result = type_check(value, category, name)
-    else:
-        raise TypeError(
-            _complaint(category, (Validator, type, None), "category")
-        )
-    return result
+    return compile(category, name).validate(value, name)
+
+def check_atomic(value, category=None, name="object"):
+    """
+    Non-raising parallel of validate_atomic().
+    @type: value: Any
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @rtype: Optional[Failure]
+    """
+    return _check(value, category, name)
 
 
 def validate_iterator(iterator, outer, **keywords):
@@ -130,54 +193,178 @@ def validate_iterator(iterator, outer, **keywords):
 def validate_sequence(sequence, category, name='object', **keywords):
     """
     Returns value, unmodified
+    Keywords workers, executor and chunksize check large sequences across
+    processes, and sample checks only some of their elements, as for
+    onefile.check_many().
     @type: mapping: Sequence
     @type: category: Sequence[TypeSpec]
     @type: name: Optional[str]
     @type: keywords: Mapping
     @rtype: Sequence
     """
-    type_check(sequence, Sequence, keywords.get('name', 'object'))
+    failure = check_sequence(sequence, category, name=name, **keywords)
+    if failure is not None:
+        raise failure.exception()
+    return sequence
+
+def check_sequence(sequence, category, name='object', **keywords):
+    """
+    Non-raising parallel of validate_sequence().
+    @type: mapping: Sequence
+    @type: category: Sequence[TypeSpec]
+    @type: name: Optional[str]
+    @type: keywords: Mapping
+    @rtype: Optional[Failure]
+    """
+    failure = check_type(sequence, Sequence, keywords.get('name', 'object'))
+    if failure is not None:
+        return failure
 
     name = keywords.get('name', 'object')
-    for i, elm in enumerate(sequence):
-        validate(elm, category, name="{0}[{1}]".format(name, i))
-    return sequence
+    return _check_many(
+        sequence, category, name,
+        sample=keywords.get('sample'),
+        workers=keywords.get('workers'),
+        executor=keywords.get('executor'),
+        chunksize=keywords.get('chunksize')
+    )
 
 
-def validate_mapping(mapping, category, name='object', **keywords):  # pylint: disable=unused-argument
+def validate_mapping(mapping, category, name='object', **keywords):
     """
+    Keyword sample checks only the items of some keys - see onefile.Sample.
     @type: mapping: Mapping
     @type: category: Sequence[TypeSpec]
     @type: name: Optional[str]
     @type: keywords: Mapping
     @rtype: Mapping
     """
-    # Input validation
-    type_check(mapping, Mapping, 'mapping')
-    type_check(category, Sequence, 'category')
+    failure = check_mapping(mapping, category, name=name, **keywords)
+    if failure is not None:
+        raise failure.exception()
+    return mapping
+
+def check_mapping(mapping, category, name='object', **keywords):
+    """
+    Non-raising parallel of validate_mapping().
+    @type: mapping: Mapping
+    @type: category: Sequence[TypeSpec]
+    @type: name: Optional[str]
+    @type: keywords: Mapping
+    @rtype: Optional[Failure]
+    """
+    failure = check_mapping_category(mapping, category)
+    if failure is not None:
+        return failure
+
+    keys_type, values_type = category
+    keys_plan, values_plan = compile(keys_type), compile(values_type)
+    if keywords.get('sample') is not None:
+        keys = _sampled(list(mapping), as_sample(keywords['sample']))
+        failure = _check_items(
+            [(key, mapping[key]) for key in keys], keys_plan, values_plan, name
+        )
+        if failure is not None:
+            step = failure.path[0]
+            failure.checked = 1 + keys.index(step.key if isinstance(step, MappingKey) else step)
+        return failure
+    # Keys and values which only need checking once per type are grouped by it
+    keys_valid = keys_plan.type_test is not None and keys_plan.test_many(mapping)
+    values_valid = (
+        values_plan.type_test is not None and
+        values_plan.test_many(six.itervalues(mapping))
+    )
+    if keys_valid and values_valid:
+        return None
+    return _check_items(
+        six.iteritems(mapping),
+        None if keys_valid else keys_plan,
+        None if values_valid else values_plan,
+        name
+    )
+
+def _check_items(items, keys_plan, values_plan, name):
+    """
+    First invalid key or value of `items`, in order. Keys or values are
+    not checked if their plan is None.
+    @type: items: Iterable[tuple[Any, Any]]
+    @type: keys_plan: Optional[Plan]
+    @type: values_plan: Optional[Plan]
+    @type: name: str
+    @rtype: Optional[Failure]
+    """
+    keys_test = _always_true if keys_plan is None else keys_plan.test
+    values_test = _always_true if values_plan is None else values_plan.test
+    for key, value in items:
+        if not keys_test(key):
+            return keys_plan.check(key, name, (MappingKey(key), ))
+        if not values_test(value):
+            return values_plan.check(value, name, (key, ))
+    return None
+
+def _always_true(value):  # pylint: disable=unused-argument
+    return True
+
+def _sampled(elements, sample):
+    """
+    The elements of `elements` chosen by `sample`.
+    @type: elements: Sequence
+    @type: sample: Sample
+    @rtype: list
+    """
+    return [elements[index] for index in sample.indexes(len(elements))]
+
+def check_mapping_category(mapping, category):
+    """
+    Input validation shared by check_mapping() and check_all().
+    @type: mapping: Any
+    @type: category: Any
+    @rtype: Optional[Failure]
+    """
+    failure = (
+        check_type(mapping, Mapping, 'mapping') or
+        check_type(category, Sequence, 'category')
+    )
+    if failure is not None:
+        return failure
     if not len(category) == 2:
         raise TypeError(str.format(
             "'category' must be a Sequence of length 2, not length {0}.",
             len(category)
         ))
     keys_type, values_type = category
-    type_check(keys_type, TypeSpec, 'category')
-    type_check(values_type, TypeSpec, 'category')
-
-    for key in mapping:
-        value = mapping[key]
-        validate(key, keys_type, name="{0} key '{1}'".format(name, key))
-        validate(value, values_type, name="{0}[{1}]".format(name, key))
+    return (
+        _check_typespec(keys_type) or
+        _check_typespec(values_type)
+    )
 
-    return mapping
+def _check_typespec(spec):
+    """
+    check_type(spec, TypeSpec, 'category'), sparing plain types the
+    TypeSpec.__instancecheck__ call.
+    @type: spec: Any
+    @rtype: Optional[Failure]
+    """
+    if isinstance(spec, type):
+        return None
+    return check_type(spec, TypeSpec, 'category')
 
 
 def promises(iterable, outer, **keywords):
     """
+    Iterator over the elements of `iterable`, validated against `outer`.
+
+    immediate: validate before returning, rather than as elements are consumed
+    chunk: number of elements read and validated at a time, and so the most
+        that are held in memory at once. None reads the whole of `iterable`.
+    skip: drop invalid elements (counting them), rather than raising
+    sample: validate only some elements of each chunk - see onefile.Sample
+    Remaining keywords are passed on to validate(), for each element.
+
     @type: iterable: Iterable
     @type: outer: TypeSpec
     @type: keywords: Mapping
-    @rtype: Iterator
+    @rtype: PromiseIterator
     """
     if keywords.pop('immediate', False):
         return promises_immediate(iterable, outer, **keywords)
@@ -186,27 +373,31 @@ def promises(iterable, outer, **keywords):
 
 def promises_immediate(iterable, outer, **keywords):
     """
+    Validates the first chunk before returning - by default, the whole of
+    `iterable`. Given `chunk`, memory stays bounded: each later chunk is
+    validated before any of its elements are yielded.
     @type: iterable: Iterable
     @type: outer: TypeSpec
     @type: keywords: Mapping
-    @rtype: Iterator
+    @rtype: PromiseIterator
     """
-    cache = list(promises_deferred(iterable, outer, **keywords))
-    return iter(cache)
+    keywords.setdefault('chunk', None)
+    promise = PromiseIterator(iterable, outer, **keywords)
+    promise._advance()  # pylint: disable=protected-access
+    return promise
 
 def promises_deferred(iterable, outer, **keywords):
     """
+    Validates as elements are consumed - by default, one at a time.
     @todo: Possible: could use pairs() to switch over iteration types
         (eg Mapping --> items, Sequence --> )
 
     @type: iterable: Iterable
     @type: outer: TypeSpec
     @type: keywords: Mapping
-    @rtype: Iterator
+    @rtype: PromiseIterator
     """
-    for i, elm in enumerate(iterable):
-        kwargs = _update_name_in_keywords(i, keywords)
-        yield validate(elm, outer, **kwargs)
+    return PromiseIterator(iterable, outer, **keywords)
 
 def _update_name_in_keywords(index, keywords):
     """
@@ -219,10 +410,157 @@ def _update_name_in_keywords(index, keywords):
     if name is None:
         name = 'object'
     name = str.format("{0}[{1}]", name, index)
-    return dict(
-        keywords.items(),
-        ('name', name)
-    )
+    return dict(keywords, name=name)
+
+
+class PromiseIterator(Iterator):
+    """
+    Iterator over `iterable`, validating its elements against `outer` in
+    chunks of up to `chunk` elements. Chunks are read lazily, and only one
+    is held at a time, so generators of any length can be streamed through.
+
+    Given `sample`, only the elements of each chunk it chooses are validated,
+    and the rest are passed through unchecked.
+
+    Counters, for monitoring long streams:
+        seen: number of elements read so far
+        sampled: number of those which were validated
+        failed: number of those which were invalid
+        elapsed: seconds spent validating
+    """
+    def __init__(self, iterable, outer, chunk=1, skip=False, sample=None, **keywords):
+        """
+        @type: iterable: Iterable
+        @type: outer: TypeSpec
+        @type: chunk: Optional[int]
+        @type: skip: bool
+        @type: sample: Optional[int, Sample]
+        @type: keywords: Mapping
+        """
+        if chunk is not None and chunk < 1:
+            raise ValueError(str.format(
+                "'chunk' must be a positive integer or None, not {0}.", chunk
+            ))
+        self.outer = outer
+        self.chunk = chunk
+        self.skip = skip
+        self.sample = None if sample is None else as_sample(sample)
+        self.keywords = keywords
+        self.seen = 0
+        self.sampled = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self._iterator = iter(iterable)
+        self._buffer = iter(())
+        # Without inner keywords, elements only need the compiled test of outer
+        self._plan = None
+        if set(keywords) <= set(['name']):
+            plan = compile(outer, keywords.get('name') or 'object')
+            if not plan.transforms:
+                self._plan = plan
+
+    def __next__(self):
+        while True:
+            try:
+                return next(self._buffer)
+            except StopIteration:
+                if not self._advance():
+                    raise
+
+    next = __next__
+
+    def _advance(self):
+        """
+        Reads and validates the next chunk. False once `iterable` is exhausted.
+        @rtype: bool
+        """
+        if self.chunk is None:
+            elements = list(self._iterator)
+        else:
+            elements = list(itertools.islice(self._iterator, self.chunk))
+        if not elements:
+            return False
+        start = timeit.default_timer()
+        seen, failed = self.seen, self.failed
+        try:
+            self._buffer = iter(self._validate_chunk(elements))
+        finally:
+            elapsed = timeit.default_timer() - start
+            self.elapsed += elapsed
+            recorder = active_recorder()
+            if recorder is not None:
+                # One latency sample per chunk
+                recorder.record(self.outer, 'promises', elapsed,
+                                self.seen - seen, self.failed - failed)
+        return True
+
+    def _validate_chunk(self, elements):
+        """
+        @type: elements: list
+        @rtype: list
+        """
+        if self.sample is not None:
+            return self._validate_sample(elements)
+        plan = self._plan
+        if plan is not None and len(elements) > 1 and plan.test_many(elements):
+            self.seen += len(elements)
+            self.sampled += len(elements)
+            return elements
+        results = []
+        for index, element in enumerate(elements, self.seen):
+            self.seen = index + 1
+            self.sampled += 1
+            if plan is not None:
+                if plan.test(element):
+                    results.append(element)
+                    continue
+                error = plan.check(element, self._name(index)).exception()
+            else:
+                try:
+                    results.append(validate(
+                        element, self.outer,
+                        **_update_name_in_keywords(index, self.keywords)
+                    ))
+                    continue
+                except ValidationError as exc:
+                    error = exc
+            self.failed += 1
+            if not self.skip:
+                raise error
+        return results
+
+    def _validate_sample(self, elements):
+        """
+        @type: elements: list
+        @rtype: list
+        """
+        indexes = self.sample.indexes(len(elements))
+        results = list(elements)
+        invalid = []
+        for index in indexes:
+            self.sampled += 1
+            try:
+                results[index] = validate(
+                    elements[index], self.outer,
+                    **_update_name_in_keywords(self.seen + index, self.keywords)
+                )
+            except ValidationError:
+                self.failed += 1
+                if not self.skip:
+                    self.seen += index + 1
+                    raise
+                invalid.append(index)
+        self.seen += len(elements)
+        for index in reversed(invalid):
+            del results[index]
+        return results
+
+    def _name(self, index):
+        """
+        @type: index: int
+        @rtype: str
+        """
+        return _update_name_in_keywords(index, self.keywords)['name']
 
 
 
@@ -270,20 +608,20 @@ class SequenceOf(ValueABC):
         """Alternate constructor method."""
         type_check(typespec, TypeSpec, 'typespec')  # Union[type, Sequence[type]]
         if isinstance(typespec, type):
-            name = "SequenceOf" + type.__name__
+            name = "SequenceOf" + typespec.__name__
         else:  # isinstance(typespec, Sequence):
             name = "SequenceOfUnion"
-        return type(name, (SequenceOf, ), {'typespec': typespec})
+            typespec = tuple(typespec)
+        return intern_spec(
+            (SequenceOf, typespec),
+            lambda: type(name, (SequenceOf, ), {'typespec': typespec})
+        )
     @classmethod
     def __instancecheck__(cls, instance):
         return isinstance(instance, cls.typespec)
 
 
 # ---------------- Material shared from old validate.py
-class ValidationError(TypeError):
-    """Basic exception type."""
-    pass
-
 def _non_string_sequence(obj):
     """type_check for non-string sequences."""
     return isinstance(obj, Sequence) and not isinstance(obj, basestring)
@@ -323,3 +661,11 @@ def type_check(value, category, name):
     if not isinstance(value, category):
         raise ValidationError(_complaint(value, category, name))
     return value
+
+def check_type(value, category, name):
+    """
+    Non-raising parallel of type_check(). Returns None, or a Failure.
+    """
+    if isinstance(value, category):
+        return None
+    return Failure(value, category, name)
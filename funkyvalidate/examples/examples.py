@@ -26,6 +26,13 @@ class PositiveInteger(int):
                 return True
         return False
 
+    @classmethod
+    def _array_check_(cls, array):
+        """Vectorized __instancecheck__, over a 1-d numpy array."""
+        if array.dtype.hasobject:
+            return None
+        return (array > 0) & issubclass(array.dtype.type, int)
+
     def __new__(cls, *args, **kwargs):
         self = int(*args, **kwargs)
         if not isinstance(self, cls):
@@ -1,12 +1,15 @@
 import os
 
 from funkyvalidate import ValueMeta
+from funkyvalidate.examples.filesystem import verdicts, DIRECTORY
 
 class ExistingDirectory(str):
     """
     Non-instanced type-checking class (a VOG).
     """
     __metaclass__ = ValueMeta
+    # Answers isdir() - os.path, or a FilesystemIndex to avoid stat() per check
+    filesystem = os.path
     def __init__(self, value):
         cls = type(self)
         if not cls.__instancecheck__(value):
@@ -16,10 +19,21 @@ class ExistingDirectory(str):
     @classmethod
     def __instancecheck__(cls, instance):
         if isinstance(instance, basestring):
-            if os.path.isdir(instance):
+            if cls.filesystem.isdir(instance):
                 return True
         return False
 
+    @classmethod
+    def _check_many_(cls, paths):
+        """
+        Whether each of `paths` is a directory, in order. Paths sharing a parent
+        directory are resolved together, from one listing of it.
+        Used by check_many(paths, cls) and the other *_many() functions.
+        @type: paths: Iterable[Any]
+        @rtype: list[bool]
+        """
+        return verdicts(paths, DIRECTORY, cls.filesystem)
+
     @classmethod
     def _exception_(cls, instance):
         if isinstance(instance, basestring):
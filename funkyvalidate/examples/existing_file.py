@@ -3,12 +3,15 @@ import os
 import six
 
 from funkyvalidate import ValueMeta
+from funkyvalidate.examples.filesystem import verdicts, FILE
 
 @six.add_metaclass(ValueMeta)
 class ExistingFile(str):
     """
     Non-instanced type-checking class (a VOG).
     """
+    # Answers isfile() - os.path, or a FilesystemIndex to avoid stat() per check
+    filesystem = os.path
     #__metaclass__ = ValueMeta
     def __init__(self, value):
         cls = type(self)
@@ -19,10 +22,21 @@ class ExistingFile(str):
     @classmethod
     def __instancecheck__(cls, instance):
         if isinstance(instance, basestring):
-            if os.path.isfile(instance):
+            if cls.filesystem.isfile(instance):
                 return True
         return False
     @classmethod
+    def _check_many_(cls, paths):
+        """
+        Whether each of `paths` is a file, in order. Paths sharing a parent
+        directory are resolved together, from one listing of it.
+        Used by check_many(paths, cls) and the other *_many() functions.
+        @type: paths: Iterable[Any]
+        @rtype: list[bool]
+        """
+        return verdicts(paths, FILE, cls.filesystem)
+
+    @classmethod
     def _exception_(cls, instance):
         if isinstance(instance, basestring):
             return IOError(str.format(
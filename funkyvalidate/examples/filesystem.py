@@ -0,0 +1,295 @@
+"""
+Filesystem lookups for ExistingFile and ExistingDirectory, which avoid
+a stat() call per path checked.
+
+FilesystemIndex is an in-memory snapshot of a directory tree:
+    index = FilesystemIndex('/data/dataset')
+    ExistingFile.filesystem = ExistingDirectory.filesystem = index
+    ...
+    index.refresh()   # rescans only directories which have changed
+
+kinds() looks up many paths at once, with one listing per directory
+rather than one stat() per path. It backs check_many(paths, ExistingFile).
+
+os.scandir is used where available (Python 3.5+, or the 'scandir'
+package on Python 2), falling back to os.listdir and stat.
+"""
+import collections
+import os
+import stat
+
+import six
+
+try:
+    from os import scandir as _scandir
+except ImportError:  # Python 2
+    try:
+        from scandir import scandir as _scandir
+    except ImportError:
+        _scandir = None
+
+
+# Kinds of directory entries
+FILE = 'file'
+DIRECTORY = 'directory'
+OTHER = 'other'
+
+# kinds() stats paths one by one in directories with fewer paths than this
+BUCKET_THRESHOLD = 8
+
+
+class FilesystemIndex(object):
+    """
+    Snapshot of the files and directories under `root`, answering the
+    isfile/isdir/exists queries of os.path from memory.
+
+    Paths outside the indexed directories are looked up with stat(),
+    and those found to be missing are remembered until refresh().
+    Symlinks to directories are not followed into.
+    """
+    def __init__(self, root):
+        """
+        @type: root: str
+        """
+        self.root = os.path.abspath(root)
+        # directory --> (mtime, {name: kind}, subdirectories)
+        self._listings = {}
+        self._missing = set()
+        self.scans = 0
+        self._scan_tree(self.root)
+
+    def kind(self, path):
+        """
+        FILE, DIRECTORY, OTHER, or None if nothing exists at `path`.
+        @type: path: str
+        @rtype: Optional[str]
+        """
+        if not _lexical(path):
+            # abspath() would drop the trailing separator, which requires
+            # a directory, or resolve '..' ahead of the symlinks before it
+            return stat_kind(path)
+        path = os.path.abspath(path)
+        directory, name = os.path.split(path)
+        listing = self._listings.get(directory)
+        if listing is not None:
+            return listing[1].get(name)
+        if path in self._missing:
+            return None
+        kind = stat_kind(path)
+        if kind is None:
+            self._missing.add(path)
+        return kind
+
+    def isfile(self, path):
+        return self.kind(path) == FILE
+
+    def isdir(self, path):
+        return self.kind(path) == DIRECTORY
+
+    def exists(self, path):
+        return self.kind(path) is not None
+
+    def refresh(self):
+        """
+        Bring the snapshot up to date, with one stat() per indexed directory.
+        Only directories whose mtime has changed are listed again.
+        """
+        self._missing.clear()
+        for directory in sorted(self._listings):
+            if directory not in self._listings:
+                # Removed along with a parent
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                self._drop(directory)
+                continue
+            if mtime != self._listings[directory][0]:
+                self._rescan(directory)
+
+    def _scan_tree(self, top):
+        """
+        @type: top: str
+        """
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            try:
+                stack.extend(self._scan(directory))
+            except OSError:
+                if directory == self.root:
+                    raise
+                # Unreadable - left to stat()
+
+    def _scan(self, directory):
+        """
+        List `directory` into the index, returning its subdirectories.
+        @type: directory: str
+        @rtype: list[str]
+        """
+        # mtime is read first, so changes made while listing are seen by refresh()
+        mtime = os.stat(directory).st_mtime
+        kinds, names = listing(directory)
+        subdirectories = [os.path.join(directory, name) for name in names]
+        self._listings[directory] = (mtime, kinds, subdirectories)
+        self.scans += 1
+        return subdirectories
+
+    def _rescan(self, directory):
+        """
+        @type: directory: str
+        """
+        previous = self._listings[directory][2]
+        try:
+            current = self._scan(directory)
+        except OSError:
+            self._drop(directory)
+            return
+        for subdirectory in set(previous).difference(current):
+            self._drop(subdirectory)
+        for subdirectory in current:
+            if subdirectory not in self._listings:
+                self._scan_tree(subdirectory)
+
+    def _drop(self, directory):
+        """
+        Remove `directory`, and everything indexed beneath it.
+        @type: directory: str
+        """
+        prefix = os.path.join(directory, '')
+        for indexed in list(self._listings):
+            if indexed == directory or indexed.startswith(prefix):
+                del self._listings[indexed]
+
+
+def kinds(paths, threshold=None):
+    """
+    Kind of each of `paths` (see stat_kind()), in order. Paths are bucketed
+    by parent directory, and each bucket is resolved from a single listing
+    of its directory - unless the bucket has fewer than `threshold` paths,
+    or os.scandir is unavailable. Names missing from a listing are
+    stat()ed, to keep the answers of case-insensitive filesystems.
+    @type: paths: Iterable[str]
+    @type: threshold: Optional[int]
+    @rtype: list[Optional[str]]
+    """
+    if threshold is None:
+        threshold = BUCKET_THRESHOLD
+    paths = list(paths)
+    results = [None] * len(paths)
+    buckets = collections.defaultdict(list)
+    for position, path in enumerate(paths):
+        directory, name = os.path.split(path)
+        if name in ('', os.curdir, os.pardir):
+            results[position] = stat_kind(path)
+        else:
+            buckets[directory].append((position, name))
+
+    for directory, bucket in six.iteritems(buckets):
+        entries = {}
+        if _scandir is not None and len(bucket) >= threshold:
+            try:
+                entries = listing(directory or os.curdir)[0]
+            except OSError:
+                pass
+        for position, name in bucket:
+            kind = entries.get(name)
+            if kind is None:
+                kind = stat_kind(os.path.join(directory, name))
+            results[position] = kind
+    return results
+
+def verdicts(paths, kind, filesystem=os.path):
+    """
+    Whether each of `paths` is a string naming an entry of `kind`, in order.
+    `filesystem` is os.path - looked up through kinds() - or a FilesystemIndex.
+    @type: paths: Iterable[Any]
+    @type: kind: str
+    @type: filesystem: Union[module, FilesystemIndex]
+    @rtype: list[bool]
+    """
+    paths = list(paths)
+    positions = [
+        position for position, path in enumerate(paths)
+        if isinstance(path, six.string_types)
+    ]
+    names = [paths[position] for position in positions]
+    if filesystem is os.path:
+        found = kinds(names)
+    else:
+        found = [filesystem.kind(name) for name in names]
+    results = [False] * len(paths)
+    for position, found_kind in zip(positions, found):
+        results[position] = (found_kind == kind)
+    return results
+
+def listing(directory):
+    """
+    Kinds of the entries of `directory`, by name, and the names of its
+    subdirectories which are not symlinks. Kinds follow symlinks, as
+    os.path.isfile and os.path.isdir do.
+    @type: directory: str
+    @rtype: tuple[dict[str, str], list[str]]
+    """
+    kinds = {}
+    subdirectories = []
+    if _scandir is not None:
+        for entry in _scandir(directory):
+            kinds[entry.name] = _entry_kind(entry)
+            if kinds[entry.name] == DIRECTORY and not entry.is_symlink():
+                subdirectories.append(entry.name)
+    else:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            kinds[name] = stat_kind(path)
+            if kinds[name] == DIRECTORY and not os.path.islink(path):
+                subdirectories.append(name)
+    return kinds, subdirectories
+
+def stat_kind(path):
+    """
+    FILE, DIRECTORY, OTHER, or None, for `path` - from a stat() call.
+    @type: path: str
+    @rtype: Optional[str]
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return None
+    return _mode_kind(mode)
+
+def _lexical(path):
+    """
+    Whether os.path.abspath(path) names the same entry as `path` does.
+    @type: path: str
+    @rtype: bool
+    """
+    separators = os.sep + (os.altsep or '')
+    if not path or path[-1] in separators:
+        return False
+    if os.altsep:
+        path = path.replace(os.altsep, os.sep)
+    return os.pardir not in path.split(os.sep)
+
+def _entry_kind(entry):
+    """
+    @type: entry: os.DirEntry
+    @rtype: Optional[str]
+    """
+    try:
+        if entry.is_file():
+            return FILE
+        elif entry.is_dir():
+            return DIRECTORY
+        mode = entry.stat().st_mode
+    except OSError:
+        # Broken symlink
+        return None
+    return _mode_kind(mode)
+
+def _mode_kind(mode):
+    if stat.S_ISREG(mode):
+        return FILE
+    elif stat.S_ISDIR(mode):
+        return DIRECTORY
+    return OTHER
@@ -2,7 +2,7 @@
 Convenience for run-time (isinstance) type-checking structured & nested data.
 """
 from valueabc import ValueABC
-from validate import is_valid
+from onefile import compile, intern_spec, ValidationError
 
 # def Nested(category, inner):
 #     """
@@ -40,6 +40,13 @@ class Nested(ValueABC):
 
     @classmethod
     def inherit(cls, outer, inner):
+        """
+        Equal (outer, inner) pairs return the identical class.
+        """
+        return intern_spec((Nested, outer, inner), lambda: cls._build(outer, inner))
+
+    @classmethod
+    def _build(cls, outer, inner):
         name = "".join(
             part.capitalize() for part in 
             (outer.__name__, "of", inner.__name__)
@@ -59,7 +66,11 @@ class Nested(ValueABC):
         if cls is Nested:
             return is_ancestor(cls, type(instance))
         else:
-            return is_valid(instance, category=cls._outer, inner=cls._inner)
+            try:
+                return compile(cls).test(instance)
+            except ValidationError:
+                # Malformed inner tuple of types
+                return False
 
     @classmethod
     def __subclasscheck__(cls, subclass):
@@ -16,8 +16,19 @@ Single file version.
 
 import collections
 import abc
+import contextlib
+import functools
+import hashlib
+import itertools
+import linecache
+import marshal
+import os
 import six
+import sys
+import threading
+import timeit
 import types
+import weakref
 
 # ===================================
 # errors.py
@@ -51,7 +62,166 @@ def _hasattr(C, attr):
     except AttributeError:
         # Old-style class
         return hasattr(C, attr)
- 
+
+
+def is_ancestor(cls, subclass):
+    """
+    @type: cls: type
+    @type: subclass: type
+    @rtype: bool
+    """
+    try:
+        return cls in subclass.__mro__
+    except AttributeError:
+        # raise same exception as issubclass(instance, klass)
+        raise TypeError(str.format(
+            "argument 1 must be a class."
+        ))
+
+
+class SpecRegistry(object):
+    """
+    Interning table for generated spec classes (Union, Tuple, Nested, ...),
+    keyed on their structure, with bounded memory.
+
+    The `capacity` most recently used specs are held strongly. Older specs
+    are only held weakly, and are dropped once nothing else uses them -
+    such as a Plan, which compile()'s cache keeps while it is in use.
+    Listeners given to on_evict() are told when a spec stops being recent.
+    """
+    def __init__(self, capacity=1024):
+        """
+        @type: capacity: int
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._refs = {}  # key --> weakref to spec
+        self._keys = weakref.WeakKeyDictionary()  # spec --> key
+        self._recent = collections.OrderedDict()  # key --> spec
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def intern(self, key, build):
+        """
+        Returns the spec already built for `key`, or builds it with build().
+        Raises TypeError if `key` is unhashable.
+        @type: key: Hashable
+        @type: build: Callable[[], type]
+        @rtype: type
+        """
+        with self._lock:
+            ref = self._refs.get(key)
+            spec = None if ref is None else ref()
+            if spec is None:
+                self.misses += 1
+                spec = build()
+                self._refs[key] = weakref.ref(spec, functools.partial(self._forget, key))
+                self._keys[spec] = key
+            else:
+                self.hits += 1
+            self._use(key, spec)
+            return spec
+
+    def touch(self, spec):
+        """
+        Mark `spec` as recently used, if it is one of this registry's.
+        @type: spec: Any
+        """
+        with self._lock:
+            key = self._keys.get(spec) if _weakrefable(spec) else None
+            if key is not None:
+                self._use(key, spec)
+
+    def on_evict(self, listener):
+        """
+        @type: listener: Callable[[type], None]
+        """
+        self._listeners.append(listener)
+
+    def stats(self):
+        """
+        count: specs alive, recent: specs held strongly,
+        nbytes: approximate memory of the live specs, and hits/misses
+        of intern() and evictions from the recent specs.
+        @rtype: dict[str, int]
+        """
+        with self._lock:
+            specs = [spec for spec in (ref() for ref in list(self._refs.values()))
+                     if spec is not None]
+            return {
+                'count': len(specs),
+                'recent': len(self._recent),
+                'capacity': self.capacity,
+                'nbytes': sum(_class_nbytes(spec) for spec in specs),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _use(self, key, spec):
+        self._recent.pop(key, None)
+        self._recent[key] = spec
+        while len(self._recent) > self.capacity:
+            _, evicted = self._recent.popitem(last=False)
+            self.evictions += 1
+            for listener in self._listeners:
+                listener(evicted)
+
+    def _forget(self, key, ref):
+        # Called as the spec is collected - no lock, as this can run
+        # inside intern(), when it triggers garbage collection.
+        if self._refs.get(key) is ref:
+            del self._refs[key]
+
+
+SPECS = SpecRegistry()
+
+def intern_spec(key, build):
+    """
+    Returns the spec class already built for `key`, or builds it with
+    build(). Equal specs are then the identical class, so spec creation
+    is a lookup after the first, and caches keyed on specs are shared.
+    @type: key: Hashable
+    @type: build: Callable[[], type]
+    @rtype: type
+    """
+    try:
+        return SPECS.intern(key, build)
+    except TypeError:
+        # Unhashable parts, such as some Validator instances
+        return build()
+
+def _weakrefable(obj):
+    try:
+        weakref.ref(obj)
+    except TypeError:
+        return False
+    return True
+
+def _class_nbytes(cls):
+    """
+    Approximate memory of a class: the type object, its namespace,
+    and the caches ABCMeta keeps on it.
+    @type: cls: type
+    @rtype: int
+    """
+    nbytes = sys.getsizeof(cls) + sys.getsizeof(dict(vars(cls)))
+    for name in ('_abc_registry', '_abc_cache', '_abc_negative_cache'):
+        weak_set = vars(cls).get(name)
+        if weak_set is not None:
+            nbytes += sys.getsizeof(weak_set.data)
+    return nbytes
+
+def _hit_rate(hits, misses):
+    """
+    @type: hits: int
+    @type: misses: int
+    @rtype: float
+    """
+    lookups = hits + misses
+    return hits / float(lookups) if lookups else 0.0
 
 
 # ===================================
@@ -59,11 +229,50 @@ def _hasattr(C, attr):
 # ===================================
 def meets(obj, interface):
     """
+    Verdicts that are met are cached per class and interface, in weak
+    references, so an instance is only checked against its own __dict__
+    on each call. Classes may gain missing methods later, but cached
+    verdicts assume methods are not removed or made abstract - otherwise,
+    call clear_meets_cache().
+    @type: obj: object
+    @type: interface: abc.ABCMeta
+    @rtype: bool
+    """
+    if _RECORDER is not None:
+        return _RECORDER.predicate('meets', interface, _meets_cached, obj, interface)
+    return _meets_cached(obj, interface)
+
+def _meets_cached(obj, interface):
+    """
+    @type: obj: object
+    @type: interface: abc.ABCMeta
+    @rtype: bool
+    """
+    if isinstance(obj, type):
+        verdict = _conformance(
+            _CLASS_CONFORMANCE, obj, interface, _class_conformance
+        )
+        if verdict is None:
+            return _meets(obj, interface)
+        return verdict
+    record = _conformance(
+        _INSTANCE_CONFORMANCE, type(obj), interface, _instance_conformance
+    )
+    if record is None:
+        return _meets(obj, interface)
+    return _meets_instance(obj, record)
+
+def _meets(obj, interface):
+    """
+    Uncached version of meets(). Stops at the first missing abstract.
     @type: obj: object
     @type: interface: abc.ABCMeta
     @rtype: bool
     """
-    return not bool(list(missing_abstracts(obj, interface)))
+    for name in interface.__abstractmethods__:
+        if not has_concrete_method(obj, name):
+            return False
+    return True
 
 def missing_abstracts(obj, interface):
     """
@@ -96,10 +305,239 @@ def is_abstract_method(method):
     return getattr(method, '__isabstractmethod__', False)
 
 
+# (class, interface) --> verdict, for meets() on classes.
+# Keys are weak references, removed when either is collected.
+_CLASS_CONFORMANCE = {}
+# (class, interface) --> record, for meets() on instances of that class
+_INSTANCE_CONFORMANCE = {}
+# [hits, misses] of both tables, for stats()
+_CONFORMANCE_LOOKUPS = [0, 0]
+
+# Classes whose __getattribute__ is known to be standard attribute lookup
+_PLAIN_GETATTRIBUTE = frozenset([
+    object, int, float, bool, complex, tuple, list, dict, set, frozenset,
+    six.binary_type, six.text_type
+] + list(six.integer_types))
+
+def clear_meets_cache():
+    """Forget cached meets() verdicts, after classes have been modified."""
+    _CLASS_CONFORMANCE.clear()
+    _INSTANCE_CONFORMANCE.clear()
+
+def _conformance(table, cls, interface, resolve):
+    """
+    Cached resolve(cls, interface), for verdicts which are met.
+    None if either cannot be weakly referenced.
+    @type: table: dict
+    @type: cls: type
+    @type: interface: abc.ABCMeta
+    @type: resolve: Callable[[type, abc.ABCMeta], Any]
+    @rtype: Any
+    """
+    try:
+        record = table[weakref.ref(cls), weakref.ref(interface)]
+    except KeyError:
+        _CONFORMANCE_LOOKUPS[1] += 1
+    except TypeError:
+        return None
+    else:
+        _CONFORMANCE_LOOKUPS[0] += 1
+        return record
+
+    record = resolve(cls, interface)
+    if record is None or (record[0] if isinstance(record, tuple) else record):
+        # Only verdicts that hold: a class failing now may yet gain the
+        # missing methods. None - to check uncached - always holds.
+        def forget(_):
+            table.pop(key, None)
+        key = (weakref.ref(cls, forget), weakref.ref(interface, forget))
+        table[key] = record
+    return record
+
+def _class_conformance(cls, interface):
+    """
+    None if the metaclass customizes attribute lookup on `cls`.
+    @type: cls: type
+    @type: interface: abc.ABCMeta
+    @rtype: Optional[bool]
+    """
+    if _hasattr(type(cls), '__getattr__'):
+        return None
+    return _meets(cls, interface)
+
+def _instance_conformance(cls, interface):
+    """
+    Resolves how instances of `cls` meet each abstract name of `interface`,
+    as far as can be known from the class alone.
+    Returns (all_met, ((name, met), ...), dynamic_names) - where dynamic
+    names are data or unfamiliar descriptors, looked up per instance.
+    None if `cls` customizes attribute lookup.
+    @type: cls: type
+    @type: interface: abc.ABCMeta
+    @rtype: Optional[tuple]
+    """
+    if _hasattr(cls, '__getattr__'):
+        return None
+    owner = next(B for B in cls.__mro__ if '__getattribute__' in B.__dict__)
+    if owner not in _PLAIN_GETATTRIBUTE:
+        return None
+
+    verdicts = []
+    dynamic = []
+    for name in interface.__abstractmethods__:
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                attr = base.__dict__[name]
+                break
+        else:
+            verdicts.append((name, False))
+            continue
+        if isinstance(attr, (types.FunctionType, staticmethod, classmethod)):
+            method = getattr(attr, '__func__', attr)
+            verdicts.append((name, not is_abstract_method(method)))
+        elif not hasattr(type(attr), '__get__'):
+            verdicts.append((name, not is_abstract_method(attr)))
+        else:
+            dynamic.append(name)
+    return (
+        all(met for _, met in verdicts), tuple(verdicts), tuple(dynamic)
+    )
+
+def _meets_instance(obj, record):
+    """
+    Applies a record from _instance_conformance() to `obj`, looking
+    only at what its __dict__ overrides.
+    @type: obj: object
+    @type: record: tuple
+    @rtype: bool
+    """
+    all_met, verdicts, dynamic = record
+    namespace = getattr(obj, '__dict__', None)
+    if namespace:
+        for name, met in verdicts:
+            if name in namespace:
+                met = not is_abstract_method(namespace[name])
+            if not met:
+                return False
+    elif not all_met:
+        return False
+    for name in dynamic:
+        if not has_concrete_method(obj, name):
+            return False
+    return True
+
+
 # ===================================
 # valuemeta.py
 # ===================================
-class ValueMeta(abc.ABCMeta):
+class CheckerMeta(abc.ABCMeta):
+    """
+    Base of the metaclasses whose classes resolve their __instancecheck__
+    and __subclasscheck__ once, when created - see _resolve_checkers() -
+    rather than looking them up on every isinstance/issubclass call.
+    Shared by ValueMeta, that of funkyvalidate.valuemeta, and draft_v3's
+    TypeCheckableMeta. Classes with neither checker fall back to
+    _default_instancecheck / _default_subclasscheck of their metaclass.
+    """
+    def __init__(cls, name, bases, namespace):
+        super(CheckerMeta, cls).__init__(name, bases, namespace)
+        _resolve_checkers(cls)
+
+    def __instancecheck__(cls, instance):
+        return cls._instance_checker(instance)
+
+    def __subclasscheck__(cls, subclass):
+        return cls._subclass_checker(subclass)
+
+    def __setattr__(cls, name, value):
+        super(CheckerMeta, cls).__setattr__(name, value)
+        if name in _CHECKER_SOURCES:
+            _refresh_checkers(cls)
+
+    def __delattr__(cls, name):
+        super(CheckerMeta, cls).__delattr__(name)
+        if name in _CHECKER_SOURCES:
+            _refresh_checkers(cls)
+
+    def _default_instancecheck(cls, instance):
+        return abc.ABCMeta.__instancecheck__(cls, instance)
+
+    def _default_subclasscheck(cls, subclass):
+        return abc.ABCMeta.__subclasscheck__(cls, subclass)
+
+
+# Reassigning any of these on a class changes which checkers it resolves to
+_CHECKER_SOURCES = frozenset(['__instancecheck__', '__subclasscheck__', '__bases__'])
+
+def _resolve_checkers(cls):
+    """
+    Looks up the effective __instancecheck__ and __subclasscheck__ of `cls`
+    once, and stores them on the class, so isinstance/issubclass do not
+    have to walk the __mro__ on every call.
+
+    Only CheckerMeta classes re-resolve when they are changed. If a plain
+    class - which is not watched - comes in the __mro__ before the checker
+    is found, a checker it gains later would be missed, so that lookup is
+    left to each call instead.
+    @type: cls: CheckerMeta
+    @rtype: None
+    """
+    meta = type(cls)
+    type.__setattr__(cls, '_instance_checker', _resolve_checker(
+        cls, '__instancecheck__', functools.partial(meta._default_instancecheck, cls)
+    ))
+    type.__setattr__(cls, '_subclass_checker', _resolve_checker(
+        cls, '__subclasscheck__', functools.partial(meta._default_subclasscheck, cls)
+    ))
+
+def _resolve_checker(cls, name, default):
+    """
+    @type: cls: CheckerMeta
+    @type: name: str
+    @type: default: Callable[[Any], bool]
+    @rtype: Callable[[Any], bool]
+    """
+    for klass in cls.__mro__:
+        if _unwatched(klass):
+            return functools.partial(_late_check, cls, name, default)
+        if name in klass.__dict__:
+            return getattr(cls, name)
+    return default
+
+def _unwatched(klass):
+    """
+    Whether `klass` could gain a checker without CheckerMeta noticing.
+    Built-in types cannot be changed.
+    @type: klass: type
+    @rtype: bool
+    """
+    if isinstance(klass, CheckerMeta):
+        return False
+    return not isinstance(klass, type) or bool(klass.__flags__ & _HEAPTYPE)
+
+# Py_TPFLAGS_HEAPTYPE: set on classes defined in Python
+_HEAPTYPE = 1 << 9
+
+def _late_check(cls, name, default, value):
+    if _hasattr(cls, name):
+        return getattr(cls, name)(value)
+    return default(value)
+
+def _refresh_checkers(cls):
+    """
+    Re-resolves the checkers of `cls` and of every class inheriting from it.
+    @type: cls: CheckerMeta
+    @rtype: None
+    """
+    pending = [cls]
+    while pending:
+        klass = pending.pop()
+        if isinstance(klass, CheckerMeta):
+            _resolve_checkers(klass)
+        pending.extend(type.__subclasses__(klass))
+
+
+class ValueMeta(CheckerMeta):
     """
     Classes inheriting from ValueABC should be used for type hinting,
     annotations, and sometimes type-checking.
@@ -118,19 +556,6 @@ class ValueMeta(abc.ABCMeta):
     @todo: Determine: Will ValueABC.__instancecheck__ classmethod will disrupt the ValueMeta.__instancecheck__ ?
     """
 
-    def __instancecheck__(cls, instance):
-        if _hasattr(cls, '__instancecheck__'):
-            #if (cls.__instancecheck__ == ValueMeta.__instancecheck__):
-            return cls.__instancecheck__(instance)
-        else:
-            return abc.ABCMeta.__instancecheck__(cls, instance)
-
-    def __subclasscheck__(cls, subclass):
-        if _hasattr(cls, '__subclasscheck__'):
-            return cls.__subclasscheck__(subclass)
-        else:
-            return abc.ABCMeta.__subclasscheck__(cls, subclass)
-
 
 # ===================================
 # interface_type.py
@@ -191,74 +616,419 @@ class ValueABC(object):
 # ===================================
 # validate.py
 # ===================================
-def validate(value, category=None, name="object", inner=None):
+def validate(value, category=None, name="object", inner=None, sample=None,
+             workers=None, executor=None, chunksize=None):
     """
     Generic function for validation. If an `inner` set of types is provided,
     will validate each element of `value` against them.
+
+    The elements of collections (for `inner`, or a Nested category) can be
+    checked in part, given `sample` - see Sample - or across processes,
+    given `workers` or `executor` - see _check_parallel().
     @type: value: Any
     @type: category: Optional[Validator, type]
     @type: name: Optional[str]
     @type: inner: Optional[Validator, type]
+    @type: sample: Optional[int, Sample]
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
     @rtype: Any
     """
-    if category is not None:
-        result = _validate(value, category=category, name=name)
+    if _RECORDER is not None:
+        return _RECORDER.time(
+            'validate', category, _validate_all, value, category, name, inner,
+            _many_options(sample, workers, executor, chunksize)
+        )
+    return _validate_all(value, category, name, inner,
+                         _many_options(sample, workers, executor, chunksize))
+
+def _validate_all(value, category, name, inner, options):
+    """
+    validate(), given the keywords for check_many().
+    @type: options: dict[str, Any]
+    @rtype: Any
+    """
+    if options and _is_nested(category):
+        _raise(check(value, category, name, **options))
+        result = value
+    else:
+        # _validate(), inlined, as validate() is the hottest path
+        plan = compile(category, name)
+        profiler = _PROFILER
+        if profiler is not None and not plan.transforms:
+            # The traced test is the only one: values may be iterators
+            if not profiler.trace('validate', plan, value):
+                raise ValidationError(_complaint(value, plan.category, name))
+            result = value
+        else:
+            result = plan.validate(value, name)
 
     if inner is not None:
-        _validate_inner(value, category=inner, name="object")
+        _validate_inner(value, category=inner, name="object", **options)
 
     return result
 
 
 def _validate(value, category=None, name="object"):
     """
-    Generic function for validation. If an `inner` set of types is provided,
-    will validate each element of `value` against them.
+    Validates `value` against the Plan compiled for `category`.
     @type: value: Any
     @type: category: Optional[Validator, type]
     @type: name: Optional[str]
     @rtype: Any
     """
-    if hasattr(category, 'validate'):
-        return category.__validate__(value)
-    elif isinstance(category, type):
-        return type_check(value, category, name)
-    elif category is None:  # Should this be here?
-        return value
-    elif isinstance(category, tuple):
-        # A tuple of types. Ex. isinstance(myvar, (NoneType, str))
-        for i, elm in enumerate(category):
-            validate(elm, type, name="{0}[{1}]".format(name, i))
-        return type_check(value, category, name)
-    else:
-        raise TypeError(
-            _complaint(category, (Validator, type, None), "category")
-        )
+    return compile(category, name).validate(value, name)
 
-def _validate_inner(value, category=None, name="object"):
+def _validate_inner(value, category=None, name="object", **options):
     """
     Exhausts an iterator, if inner is checked on an iterator.
     @type: value: Any
     @type: category: Optional[Validator, type]
     @type: name: str
+    @type: options: Mapping
     @rtype: None
     """
-    validate(value, collections.Iterable)
-    if not isinstance(value, collections.Iterable):
-        raise TypeError(str.format(
-            "validate_inner exhausts iterators. Collect into a Sequence before calling."
-        ))
+    _raise(check_many(value, category=category, name=name, **options))
 
-    for i, elm in enumerate(value):
-        validate(elm, category, name="{0}[{1}]".format(name, i))
-
-def is_valid(value, category=None, inner=None):
+def _many_options(sample, workers, executor, chunksize):
+    """
+    The keywords for check_many() which were given.
+    @rtype: dict[str, Any]
+    """
+    options = {}
+    if sample is not None:
+        options['sample'] = sample
+    if _is_parallel(workers, executor):
+        options.update(workers=workers, executor=executor, chunksize=chunksize)
+    return options
+
+def _raise(failure):
+    """
+    @type: failure: Optional[Failure]
+    @rtype: None
+    """
+    if failure is not None:
+        raise failure.exception()
+
+def is_valid(value, category=None, inner=None, sample=None,
+             workers=None, executor=None, chunksize=None):
+    options = _many_options(sample, workers, executor, chunksize)
+    if options:
+        return check(value, category, inner=inner, **options) is None
     try:
-        validate(value, category=category, inner=inner)
+        if not compile(category).test(value):
+            return False
+        if inner is not None:
+            return _all_valid(compile(inner), value)
     except ValidationError:
         return False
     return True
 
+def check(value, category=None, name="object", inner=None, sample=None,
+          workers=None, executor=None, chunksize=None):
+    """
+    Non-raising parallel of validate(). Returns None if `value` is valid,
+    and otherwise a Failure, which only builds its message if asked.
+    @type: value: Any
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: inner: Optional[Validator, type]
+    @type: sample: Optional[int, Sample]
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
+    @rtype: Optional[Failure]
+    """
+    try:
+        plan = compile(category, name)
+    except ValidationError as exc:
+        # Malformed tuple of types
+        return Failure(category, type, name, exc)
+    options = _many_options(sample, workers, executor, chunksize)
+    profiler = _PROFILER
+    if options and _is_nested(category):
+        failure = _check_nested(plan, value, name, options)
+    elif profiler is not None and not plan.transforms:
+        failure = None
+        if not profiler.trace('check', plan, value):
+            failure = Failure(value, plan.category, name)
+    else:
+        failure = plan.check(value, name)
+    if failure is None and inner is not None:
+        failure = check_many(value, category=inner, name="object", **options)
+    return failure
+
+def _check_nested(plan, value, name, options):
+    """
+    check() against a Nested category, with its elements checked by
+    check_many() under `options`.
+    @type: plan: Plan
+    @type: value: Any
+    @type: name: str
+    @type: options: dict[str, Any]
+    @rtype: Optional[Failure]
+    """
+    category = plan.category
+    if (compile(category._outer).test(value) and
+            isinstance(value, collections.Iterable) and
+            check_many(value, category._inner, name, **options) is None):
+        return None
+    return Failure(value, category, name)
+
+def validate_many(values, category=None, name="object", sample=None,
+                  workers=None, executor=None, chunksize=None):
+    """
+    Validates each element of `values`, returning `values`. Elements whose
+    verdict depends only on their type are checked once per distinct type.
+    Exhausts an iterator.
+    @type: values: Iterable
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: sample: Optional[int, Sample]
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
+    @rtype: Iterable
+    """
+    _raise(check_many(values, category=category, name=name, sample=sample,
+                      workers=workers, executor=executor, chunksize=chunksize))
+    return values
+
+def is_valid_many(values, category=None, sample=None,
+                  workers=None, executor=None, chunksize=None):
+    """
+    @type: values: Iterable
+    @type: category: Optional[Validator, type]
+    @type: sample: Optional[int, Sample]
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
+    @rtype: bool
+    """
+    options = _many_options(sample, workers, executor, chunksize)
+    if options:
+        return check_many(values, category, **options) is None
+    try:
+        return _all_valid(compile(category), values)
+    except ValidationError:
+        return False
+
+def check_many(values, category=None, name="object", sample=None,
+               workers=None, executor=None, chunksize=None):
+    """
+    Non-raising parallel of validate_many().
+    @type: values: Iterable
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: sample: Optional[int, Sample]
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
+    @rtype: Optional[Failure]
+    """
+    try:
+        plan = compile(category, name)
+    except ValidationError as exc:
+        return Failure(category, type, name, exc)
+    if not isinstance(values, collections.Iterable):
+        return Failure(values, collections.Iterable, name)
+    if sample is not None:
+        return _check_sample(plan, values, name, as_sample(sample))
+    if _is_parallel(workers, executor):
+        return _check_parallel(plan, values, name, workers, executor, chunksize)
+    return plan.check_many(values, name)
+
+def check_all(value, category=None, name="object", inner=None):
+    """
+    Collect-all-errors parallel of check(): a Failure for every problem
+    found, in order, rather than only the first. Invalid elements of Nested
+    categories are descended into, so each Failure is for the innermost
+    value at fault, and its `path` gives the indexes leading to it.
+    Valid values cost no formatting of names.
+    @type: value: Any
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: inner: Optional[Validator, type]
+    @rtype: list[Failure]
+    """
+    failures = collect_failures(category, [(_ROOT, value)], name)
+    if inner is not None:
+        if not isinstance(value, collections.Iterable):
+            failures.append(Failure(value, collections.Iterable, name))
+        elif _collect_needed(inner, value):
+            failures.extend(collect_failures(inner, enumerate(value), name))
+    return failures
+
+# Key for the top-level value in collect_failures(), which adds no step to its path
+_ROOT = object()
+
+def collect_failures(category, items, name="object", path=()):
+    """
+    Failures of each value in `items`, pairs of (key, value), for check_all().
+    Keys extend `path`. Nested specs are walked with an explicit stack of
+    iterators, in order.
+    @type: category: Optional[Validator, type]
+    @type: items: Iterable[tuple[Any, Any]]
+    @type: name: str
+    @type: path: tuple
+    @rtype: list[Failure]
+    """
+    try:
+        plan = compile(category, name)
+    except ValidationError as exc:
+        return [Failure(category, type, name, exc)]
+    failures = []
+    stack = [_collect_frame(plan, category, iter(items), path)]
+    while stack:
+        plan, outer, inner, items, path = stack[-1]
+        # Paths are only extended for elements which fail, or are descended into
+        for key, value in items:
+            if outer is None:
+                if not plan.test(value):
+                    failures.append(plan.check(value, name, _extend(path, key)))
+            elif not outer.test(value):
+                failures.append(outer.check(value, name, _extend(path, key)))
+            elif not isinstance(value, collections.Iterable):
+                failures.append(Failure(value, collections.Iterable, name, path=_extend(path, key)))
+            elif _collect_needed(inner, value):
+                stack.append(_collect_frame(compile(inner), inner, enumerate(value), _extend(path, key)))
+                break
+        else:
+            stack.pop()
+    return failures
+
+def _extend(path, key):
+    """
+    @type: path: tuple
+    @type: key: Any
+    @rtype: tuple
+    """
+    return path if key is _ROOT else path + (key, )
+
+def _collect_frame(plan, category, items, path):
+    """
+    @type: plan: Plan
+    @type: category: Optional[Validator, type]
+    @type: items: Iterator[tuple[Any, Any]]
+    @type: path: tuple
+    @rtype: tuple
+    """
+    if _is_nested(category):
+        return (plan, compile(category._outer), category._inner, items, path)
+    return (plan, None, None, items, path)
+
+def _collect_needed(category, values):
+    """
+    False if every element of `values` is known to be valid for `category`.
+    Iterators are walked only once, element by element.
+    @type: category: Optional[Validator, type]
+    @type: values: Iterable
+    @rtype: bool
+    """
+    if isinstance(values, collections.Iterator):
+        return True
+    try:
+        return not compile(category).test_many(values)
+    except ValidationError:
+        return True
+
+
+class Failure(object):
+    """
+    Returned by check() in place of raising ValidationError.
+    Formatting the message is deferred until `message` or `exception()`
+    is asked for, since callers trying several categories usually discard it.
+
+    `path` holds the indexes and keys leading to `value`, from the value
+    named `name` - so the full name, such as 'object[3][key]', is also
+    only formatted when asked for.
+
+    `checked` is the number of elements checked before stopping, for
+    collections checked in part - see Sample - and otherwise None.
+    """
+    __slots__ = ('value', 'category', 'path', 'checked', '_root', '_exception')
+
+    def __init__(self, value, category, name="object", exception=None, path=(),
+                 checked=None):
+        """
+        @type: value: Any
+        @type: category: Any
+        @type: name: str
+        @type: exception: Optional[Exception]
+        @type: path: tuple
+        @type: checked: Optional[int]
+        """
+        self.value = value
+        self.category = category
+        self.path = path
+        self.checked = checked
+        self._root = name
+        self._exception = exception
+
+    @property
+    def name(self):
+        """
+        @rtype: str
+        """
+        return _path_name(self._root, self.path)
+
+    @property
+    def message(self):
+        """
+        @rtype: str
+        """
+        if self._exception is not None:
+            return str(self._exception)
+        return _complaint(self.value, self.category, self.name)
+
+    def exception(self):
+        """
+        @rtype: Exception
+        """
+        if self._exception is not None:
+            return self._exception
+        return ValidationError(self.message)
+
+    def __repr__(self):
+        return str.format("<Failure: {0}>", self.message)
+
+
+class MappingKey(object):
+    """
+    Step of a Failure's path, for when a mapping's key is invalid,
+    rather than the value stored under it.
+    """
+    __slots__ = ('key', )
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return isinstance(other, MappingKey) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((MappingKey, self.key))
+
+    def __repr__(self):
+        return str.format("MappingKey({0!r})", self.key)
+
+def _path_name(name, path):
+    """
+    @type: name: str
+    @type: path: tuple
+    @rtype: str
+    """
+    for step in path:
+        if isinstance(step, MappingKey):
+            name = "{0} key '{1}'".format(name, step.key)
+        else:
+            name = "{0}[{1}]".format(name, step)
+    return name
+
 def type_check(value, category, name):
     if not isinstance(value, category):
         raise ValidationError(_complaint(value, category, name))
@@ -355,6 +1125,11 @@ class UnionMeta(ValueMeta):
 
         return cls
 
+    def __init__(cls, name, bases, namespace):
+        super(UnionMeta, cls).__init__(name, bases, namespace)
+        if '_types' in namespace:
+            cls._plain_types, cls._value_types = handle_plain_types(namespace['_types'])
+
     def __call__(cls, *args, **kwargs):
         """
         Triggered whenever the newly created class is "called"
@@ -399,30 +1174,45 @@ class ConcreteSet(collections.MutableSet):
 
 class UnionBase(ConcreteSet):
     __metaclass__ = UnionMeta
+    # Members split by UnionMeta: those checked by type alone, in one
+    # C-level isinstance() call, and the value-dependent rest, after them.
+    _plain_types = None
+    _value_types = ()
+
     @classmethod
-    def __instancecheck__(cls, instance):                
-        return any(
-            isinstance(instance, _type)
-            for _type in cls._types
-        )
+    def __instancecheck__(cls, instance):
+        if cls._plain_types is None:
+            # Union itself, rather than a TypeUnion
+            return abc.ABCMeta.__instancecheck__(cls, instance)
+        if isinstance(instance, cls._plain_types):
+            return True
+        for _type in cls._value_types:
+            if isinstance(instance, _type):
+                return True
+        return False
     @classmethod
     def __subclasscheck__(cls, subclass):
-        return any(
-            issubclass(subclass, _type)
-            for _type in cls._types
-        )
+        if cls._plain_types is None:
+            # Reached by ABC registry walks, such as isinstance(12, Iterable).
+            # Only real inheritance counts: ABCMeta would go on to ask each
+            # TypeUnion, making int Iterable once Union(int, ...) exists.
+            return type.__subclasscheck__(cls, subclass)
+        if issubclass(subclass, cls._plain_types):
+            return True
+        for _type in cls._value_types:
+            if issubclass(subclass, _type):
+                return True
+        return False
 
 
 class Union(UnionBase):
     def __new__(cls, *utypes):
         """Create and return a new class inheriting from Union."""
         _types = handle_union_types(utypes)
-        TypeUnion = type(
-            'TypeUnion',
-            (Union, ),
-            {'_types': _types}
+        return intern_spec(
+            (Union, frozenset(_types)),
+            lambda: type('TypeUnion', (Union, ), {'_types': _types})
         )
-        return TypeUnion
 
 
 class Optional(Union):
@@ -438,6 +1228,16 @@ class Tuple(ConcreteSet):
     """
     A tuple whose instances match the types passed into the constructor for Tuple.
     """
+    __metaclass__ = ValueMeta
+    def __new__(cls, *ttypes):
+        """Create and return a new class inheriting from Tuple."""
+        _types = tuple(handle_none_type(ttypes))
+        _types = tuple(validate(element, type) for element in _types)
+        return intern_spec(
+            (Tuple, _types),
+            lambda: type('TypeTuple', (Tuple, ), {'_types': _types})
+        )
+
     @classmethod
     def __instancecheck__(cls, instance):
         """
@@ -445,12 +1245,14 @@ class Tuple(ConcreteSet):
         @type: instance: Any
         @rtype: bool
         """
+        if not _hasattr(cls, '_types'):
+            return abc.ABCMeta.__instancecheck__(cls, instance)
         if isinstance(instance, tuple):
-            if len(instance) == len(cls.types):
+            if len(instance) == len(cls._types):
                 return all(
                     isinstance(element, _type)
                     for element, _type
-                    in zip(instance, cls.types)
+                    in zip(instance, cls._types)
                 )
             else: # not same length
                 return False
@@ -462,18 +1264,88 @@ class Tuple(ConcreteSet):
         @type: subclass: type
         @rtype: bool
         """
-        if issubclass(subclass, tuple):
-            if len(subclass) == len(cls._types):
-                return all(
-                    issubclass(element, _type)
-                    for element, _type
-                    in zip(subclass, cls._types)
-                )
-            else: # not same length
-                return False
-        else:  # not a tuple
+        if not _hasattr(cls, '_types'):
+            # Tuple itself. As for UnionBase, ABC registry walks reach it,
+            # and ABCMeta would go on to ask each TypeTuple.
+            return type.__subclasscheck__(cls, subclass)
+        if _hasattr(subclass, '_types') and is_ancestor(Tuple, subclass):
+            # Another TypeTuple: compare element types
+            return len(subclass._types) == len(cls._types) and all(
+                issubclass(element, _type)
+                for element, _type
+                in zip(subclass._types, cls._types)
+            )
+        # Element types are not known from any other class
+        return False
+
+
+# ===================================
+# records.py
+# ===================================
+class Record(ValueABC):
+    """
+    Schema for small records, checked field by field.
+
+    Dict records, with required and optional keys:
+        Person = Record({'id': int, 'name': str}, optional={'email': str})
+        isinstance({'id': 1, 'name': 'Phoebe'}, Person)
+        True
+    If `closed`, keys other than these are not allowed.
+
+    Fixed-length tuple records, with a spec per position:
+        FieldValue = Record((str, Any))
+        RawPair = Record((FieldValue, FieldValue))
+
+    Specs are anything validate() accepts: types, tuples of types,
+    Validators, and other specs.
+    """
+    def __new__(cls, fields, optional=None, closed=False):
+        """
+        Create and return a new class inheriting from Record.
+        @type: fields: Union[Mapping[Hashable, Any], Sequence[Any]]
+        @type: optional: Optional[Mapping[Hashable, Any]]
+        @type: closed: bool
+        @rtype: type
+        """
+        if isinstance(fields, collections.Mapping):
+            fields = dict(fields)
+            optional = dict(optional or {})
+            key = lambda: (Record, frozenset(six.iteritems(fields)),
+                           frozenset(six.iteritems(optional)), closed)
+        elif isinstance(fields, collections.Sequence):
+            if optional or closed:
+                raise TypeError("'optional' and 'closed' only apply to dict records.")
+            fields = tuple(fields)
+            key = lambda: (Record, fields)
+        else:
+            raise TypeError(_complaint(fields, (collections.Mapping, collections.Sequence), "fields"))
+        namespace = {'_fields': fields, '_optional': optional, '_closed': closed}
+        build = lambda: type('Record', (Record, ), namespace)
+        try:
+            key = key()
+        except TypeError:
+            # Unhashable field specs, such as some Validator instances
+            return build()
+        return intern_spec(key, build)
+
+    @classmethod
+    def __instancecheck__(cls, instance):
+        if not _hasattr(cls, '_fields'):
+            return abc.ABCMeta.__instancecheck__(cls, instance)
+        try:
+            return compile(cls).test(instance)
+        except ValidationError:
+            # Malformed tuple of types, for a field
             return False
 
+    @classmethod
+    def __subclasscheck__(cls, subclass):
+        if not _hasattr(cls, '_fields'):
+            return abc.ABCMeta.__subclasscheck__(cls, subclass)
+        if isinstance(cls._fields, dict):
+            return issubclass(subclass, collections.Mapping)
+        return issubclass(subclass, tuple)
+
 
 # ===================================
 # handlers.py
@@ -493,6 +1365,18 @@ def handle_union_types(union_types):
     return _types
 
 
+def handle_plain_types(_types):
+    """
+    Splits the members of a union into the classes whose isinstance depends
+    only on the type, and the rest.
+    @type: _types: Sequence[type]
+    @rtype: tuple[tuple[type], tuple[type]]
+    """
+    plain = tuple(_type for _type in _types if _by_type(_type))
+    value = tuple(_type for _type in _types if not _by_type(_type))
+    return plain, value
+
+
 def handle_nested_unions(_types):
     """Recursively unfolds unions into a flattened sequence of types.
     @type: _types: Sequence[type]
@@ -527,6 +1411,1700 @@ def handle_none_type(_types):
             yield element
 
 
+# ===================================
+# compile.py
+# ===================================
+class Plan(object):
+    """
+    Validation for a single category, with the dispatch over what kind of
+    category it is (Validator, type, tuple of types, Union, Tuple, Nested)
+    already resolved. Built by compile().
+
+    `test` is a predicate, value --> bool, and never formats error messages.
+    `type_test` is given when the verdict of `test` depends only on the
+    type of the value. It is then a predicate over that type, and
+    collections are checked once per distinct type of their elements.
+    """
+    __slots__ = ('category', 'test', 'type_test', '_validate', 'uses')
+
+    def __init__(self, category, test, validate=None, type_test=None):
+        """
+        @type: category: Optional[Validator, type, tuple[type]]
+        @type: test: Callable[[Any], bool]
+        @type: validate: Optional[Callable[[Any], Any]]
+        @type: type_test: Optional[Callable[[type], bool]]
+        """
+        self.category = category
+        self.test = test
+        self.type_test = type_test
+        self._validate = validate
+        # Counted by PlanCache hits, since its last sweep
+        self.uses = 0
+
+    def validate(self, value, name="object"):
+        """
+        @type: value: Any
+        @type: name: Optional[str]
+        @rtype: Any
+        """
+        if self._validate is not None:
+            return self._validate(value)
+        if self.test(value):
+            return value
+        raise ValidationError(_complaint(value, self.category, name))
+
+    def check(self, value, name="object", path=()):
+        """
+        Non-raising parallel of validate().
+        @type: value: Any
+        @type: name: Optional[str]
+        @type: path: tuple
+        @rtype: Optional[Failure]
+        """
+        if self._validate is not None:
+            try:
+                self._validate(value)
+            except ValidationError as exc:
+                return Failure(value, self.category, name, exc, path)
+            return None
+        if self.test(value):
+            return None
+        return Failure(value, self.category, name, path=path)
+
+    def is_valid(self, value):
+        """
+        @type: value: Any
+        @rtype: bool
+        """
+        return self.test(value)
+
+    @property
+    def transforms(self):
+        """
+        True if validate() returns the result of the category's __validate__,
+        which need not be the value itself.
+        @rtype: bool
+        """
+        return self._validate is not None
+
+    def test_many(self, values):
+        """
+        True if every element of `values` passes `test`.
+        @type: values: Iterable
+        @rtype: bool
+        """
+        if self.test is _always_valid:
+            return True
+        array = _as_array(values)
+        if array is not None:
+            verdicts = _array_verdicts(self, array)
+            if verdicts is not None:
+                return bool(verdicts.all())
+        if self.type_test is not None:
+            return all(six.moves.map(self.type_test, set(six.moves.map(type, values))))
+        verdicts = _bulk_verdicts(self, values)
+        if verdicts is not None:
+            return all(verdicts[1])
+        return all(six.moves.map(self.test, values))
+
+    def check_many(self, values, name="object"):
+        """
+        Returns a Failure for the first invalid element of `values`, or None.
+        Names are only formatted for the failing element.
+        @type: values: Iterable
+        @type: name: Optional[str]
+        @rtype: Optional[Failure]
+        """
+        array = _as_array(values)
+        if array is not None:
+            verdicts = _array_verdicts(self, array)
+            if verdicts is not None:
+                if verdicts.all():
+                    return None
+                i = int(verdicts.argmin())
+                return Failure(array[i], self.category, "{0}[{1}]".format(name, i))
+        if self.type_test is not None:
+            # Iterators cannot be traversed a second time to find the failure
+            if not isinstance(values, collections.Iterator):
+                if self.test_many(values):
+                    return None
+            return self._check_each_type(values, name)
+        verdicts = _bulk_verdicts(self, values)
+        if verdicts is not None:
+            values, verdicts = verdicts
+            for i, verdict in enumerate(verdicts):
+                if not verdict:
+                    return Failure(values[i], self.category, "{0}[{1}]".format(name, i))
+            return None
+        test = self.test
+        for i, element in enumerate(values):
+            if not test(element):
+                return self.check(element, "{0}[{1}]".format(name, i))
+        return None
+
+    def _check_each_type(self, values, name):
+        """
+        check_many(), testing only the first element of each type.
+        @type: values: Iterable
+        @type: name: str
+        @rtype: Optional[Failure]
+        """
+        type_test = self.type_test
+        valid = set()
+        for i, element in enumerate(values):
+            cls = type(element)
+            if cls not in valid:
+                if not type_test(cls):
+                    return self.check(element, "{0}[{1}]".format(name, i))
+                valid.add(cls)
+        return None
+
+    def __repr__(self):
+        return str.format("<Plan for {0!r}>", self.category)
+
+
+class PlanCache(dict):
+    """
+    Plans by category, holding at most about `capacity` of them.
+
+    Lookups are plain dict lookups, and a hit counts a use of the Plan.
+    When the cache is full, add() sweeps it: Plans not used since the
+    previous sweep are dropped - releasing their categories - and the
+    others' uses are reset. So Plans in steady use stay, however long ago
+    they were built. Counts are approximate under threads.
+    """
+    def __init__(self, capacity=1024):
+        """
+        @type: capacity: int
+        """
+        super(PlanCache, self).__init__()
+        self.capacity = capacity
+        self.misses = 0
+        self.evictions = 0
+        self._swept_hits = 0
+        self._lock = threading.Lock()
+
+    def add(self, category, plan):
+        """
+        @type: category: Hashable
+        @type: plan: Plan
+        """
+        with self._lock:
+            if len(self) >= self.capacity:
+                self._sweep()
+            self[category] = plan
+
+    @property
+    def hits(self):
+        """
+        @rtype: int
+        """
+        return self._swept_hits + sum(plan.uses for plan in list(self.values()))
+
+    def stats(self):
+        """
+        @rtype: dict[str, Any]
+        """
+        hits = self.hits
+        return {
+            'count': len(self),
+            'capacity': self.capacity,
+            'hits': hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': _hit_rate(hits, self.misses),
+        }
+
+    def _sweep(self):
+        for category, plan in list(self.items()):
+            self._swept_hits += plan.uses
+            if plan.uses:
+                plan.uses = 0
+            else:
+                del self[category]
+                self.evictions += 1
+        # Everything was in use since the last sweep
+        while len(self) >= self.capacity:
+            self.popitem()
+            self.evictions += 1
+
+
+def _cacheable(category):
+    """
+    Whether Plans for `category` are cached: classes, None and tuples of
+    classes, which recur as equal keys. Validator instances hash by
+    identity, so caching them would only fill the cache.
+    @type: category: Any
+    @rtype: bool
+    """
+    if isinstance(category, tuple):
+        return all(isinstance(elm, type) for elm in category)
+    return category is None or isinstance(category, type)
+
+
+_PLANS = PlanCache()
+
+def compile(category, name="object"):
+    """
+    Return the Plan for `category`, building it on first use.
+    Plans are cached, so validate() and is_valid() only dispatch over
+    a given category once. The Plan can also be hoisted out of a loop:
+        check = compile(Nested(list, int))
+        for record in records:
+            check.validate(record)
+
+    `name` is only used when complaining about a malformed category.
+    @type: category: Optional[Validator, type, tuple[type]]
+    @type: name: Optional[str]
+    @rtype: Plan
+    """
+    try:
+        plan = _PLANS[category]
+    except KeyError:
+        _PLANS.misses += 1
+        plan = _build_plan(category, name)
+        if _cacheable(category):
+            _PLANS.add(category, plan)
+        return plan
+    except TypeError:
+        # Unhashable category, such as some Validator instances
+        return _build_plan(category, name)
+    plan.uses += 1
+    return plan
+
+def _build_plan(category, name="object"):
+    """
+    @type: category: Optional[Validator, type, tuple[type]]
+    @type: name: str
+    @rtype: Plan
+    """
+    if hasattr(category, 'validate'):
+        return Plan(category, _validator_test(category), category.__validate__)
+    elif isinstance(category, type):
+        return Plan(
+            category, _type_test(category),
+            type_test=_subclass_test(category)
+        )
+    elif category is None:
+        return Plan(category, _always_valid, _identity)
+    elif isinstance(category, tuple):
+        # A tuple of types. Ex. isinstance(myvar, (NoneType, str))
+        for i, elm in enumerate(category):
+            validate(elm, type, name="{0}[{1}]".format(name, i))
+        return Plan(
+            category, _isinstance_test(category),
+            type_test=_subclass_test(category)
+        )
+    else:
+        raise TypeError(
+            _complaint(category, (Validator, type, None), "category")
+        )
+
+def _type_test(category):
+    """
+    Unfolds the spec classes (Any, Union, Tuple, Nested, Record) into predicates
+    over their compiled parts. Other classes are checked by isinstance.
+    @type: category: type
+    @rtype: Callable[[Any], bool]
+    """
+    if category is Any:
+        return _always_valid
+    elif is_ancestor(Union, category) and _hasattr(category, '_types'):
+        return _isinstance_test(category._plain_types + category._value_types)
+    elif is_ancestor(Tuple, category) and _hasattr(category, '_types'):
+        return _tuple_test(tuple(
+            compile(_type).test for _type in category._types
+        ))
+    elif _hasattr(category, '_outer') and _hasattr(category, '_inner'):
+        return _nested_test(category)
+    elif is_ancestor(Record, category) and _hasattr(category, '_fields'):
+        if isinstance(category._fields, dict):
+            return _record_test(category)
+        return _tuple_test(tuple(
+            compile(spec).test for spec in category._fields
+        ))
+    else:
+        return _isinstance_test(category)
+
+def _subclass_test(category):
+    """
+    When isinstance(value, category) depends only on type(value), returns
+    the equivalent predicate over that type. Otherwise, None.
+    @type: category: Union[type, tuple[type]]
+    @rtype: Optional[Callable[[type], bool]]
+    """
+    if not _by_type(category):
+        return None
+    def type_test(cls):
+        return issubclass(cls, category)
+    return type_test
+
+# (__instancecheck__, __subclasscheck__) of metaclasses which only consult the type
+_PLAIN_CHECKS = (
+    (type.__instancecheck__, type.__subclasscheck__),
+    (abc.ABCMeta.__instancecheck__, abc.ABCMeta.__subclasscheck__),
+)
+
+def _by_type(category):
+    """
+    @type: category: Union[type, tuple[type]]
+    @rtype: bool
+    """
+    if isinstance(category, tuple):
+        return all(_by_type(elm) for elm in category)
+    elif category is Any:
+        return True
+    elif is_ancestor(Union, category) and _hasattr(category, '_types'):
+        return _by_type(category._types)
+    elif isinstance(category, ValueMeta):
+        # Without these, ValueMeta falls back to ABCMeta
+        return not (
+            _hasattr(category, '__instancecheck__') or
+            _hasattr(category, '__subclasscheck__')
+        )
+    else:
+        meta = type(category)
+        return (meta.__instancecheck__, meta.__subclasscheck__) in _PLAIN_CHECKS
+
+def _isinstance_test(category):
+    def test(value):
+        return isinstance(value, category)
+    return test
+
+def _validator_test(validator):
+    def test(value):
+        try:
+            validator.__validate__(value)
+        except ValidationError:
+            return False
+        return True
+    return test
+
+def _tuple_test(tests):
+    length = len(tests)
+    def test(value):
+        if not isinstance(value, tuple) or len(value) != length:
+            return False
+        for element, element_test in zip(value, tests):
+            if not element_test(element):
+                return False
+        return True
+    return test
+
+# Distinct key sets a dict Record remembers the field tests of
+RECORD_KEY_SETS = 256
+
+def _record_test(category):
+    """
+    Test for a dict Record. Each distinct set of keys is resolved once -
+    with a frozenset subset test for the required keys - into the tests
+    of the fields present, which are then all records with those keys need.
+    @type: category: type
+    @rtype: Callable[[Any], bool]
+    """
+    required = frozenset(category._fields)
+    allowed = required.union(category._optional)
+    tests = dict(
+        (key, compile(spec).test)
+        for key, spec in itertools.chain(
+            six.iteritems(category._optional), six.iteritems(category._fields)
+        )
+    )
+    # frozenset of keys --> ((key, test), ...), or None if they are not allowed
+    key_sets = {}
+
+    def resolve(keys):
+        if not required.issubset(keys) or (category._closed and not keys.issubset(allowed)):
+            return None
+        return tuple((key, tests[key]) for key in keys if key in tests)
+
+    def test(value):
+        if not isinstance(value, dict) and not isinstance(value, collections.Mapping):
+            return False
+        keys = frozenset(value)
+        try:
+            field_tests = key_sets[keys]
+        except KeyError:
+            field_tests = resolve(keys)
+            if len(key_sets) < RECORD_KEY_SETS:
+                key_sets[keys] = field_tests
+        if field_tests is None:
+            return False
+        for key, field_test in field_tests:
+            if not field_test(value[key]):
+                return False
+        return True
+    return test
+
+def _nested_test(category):
+    """
+    Test for a chain of Nested specs, Nested(A, Nested(B, ... C)), unrolled
+    into the tests of its levels (A, B, ...) and the Plan of the innermost
+    category (C). Values are walked with an explicit stack of iterators,
+    in one frame, so neither the depth of the spec nor of the value is
+    limited by the recursion limit.
+    @type: category: type
+    @rtype: Callable[[Any], bool]
+    """
+    outer_tests = []
+    while _is_nested(category):
+        outer_tests.append(compile(category._outer).test)
+        category = category._inner
+    inner = compile(category)
+    last = len(outer_tests) - 1
+
+    def test(value):
+        if not (outer_tests[0](value) and isinstance(value, collections.Iterable)):
+            return False
+        if last == 0:
+            return inner.test_many(value)
+        # stack[-1] iterates over values of level len(stack)
+        stack = [iter(value)]
+        while stack:
+            level = len(stack)
+            for element in stack[-1]:
+                if not (outer_tests[level](element) and
+                        isinstance(element, collections.Iterable)):
+                    return False
+                if level == last:
+                    if not inner.test_many(element):
+                        return False
+                else:
+                    stack.append(iter(element))
+                    break
+            else:
+                stack.pop()
+        return True
+    return test
+
+def _all_valid(plan, value):
+    """
+    True if `value` is Iterable, and each of its elements is valid for `plan`.
+    @type: plan: Plan
+    @type: value: Any
+    @rtype: bool
+    """
+    if not isinstance(value, collections.Iterable):
+        return False
+    return plan.test_many(value)
+
+def _bulk_verdicts(plan, values):
+    """
+    Verdicts of `plan` for the elements of `values`, from the category's
+    classmethod _check_many_(values), which returns a sequence of booleans,
+    in order. As with _array_check_, value-dependent categories provide it
+    to answer for a whole collection at once - such as ExistingFile, which
+    lists each directory once rather than stat()ing each path.
+
+    Returns None if the category has no _check_many_, and otherwise the
+    elements, as a list, with their verdicts.
+    @type: plan: Plan
+    @type: values: Iterable
+    @rtype: Optional[tuple[list, Sequence[bool]]]
+    """
+    if plan.transforms:
+        return None
+    check_many = getattr(plan.category, '_check_many_', None)
+    if check_many is None:
+        return None
+    values = list(values)
+    return values, check_many(values)
+
+def _always_valid(value):  # pylint: disable=unused-argument
+    return True
+
+def _identity(value):
+    return value
+
+
+# ===================================
+# codegen.py
+# ===================================
+# Nested levels unrolled into loops; deeper levels call their compiled test.
+# Python allows at most 20 statically nested blocks.
+CODEGEN_DEPTH = 8
+
+# category --> Plan, whose test is generated source
+_GENERATED = PlanCache()
+
+def generate(category, name="object"):
+    """
+    Return a Plan for `category` like compile(), but whose test is Python
+    source generated for it: type checks inlined, Tuple arities unrolled,
+    and Nested levels written as plain loops. ValueABC classes, Validators
+    and Records are called as they are. The source is kept, for debugging,
+    as plan.test.source - and inspect.getsource(plan.test) finds it.
+    @type: category: Optional[Validator, type, tuple[type]]
+    @type: name: Optional[str]
+    @rtype: Plan
+    """
+    try:
+        plan = _GENERATED[category]
+    except KeyError:
+        _GENERATED.misses += 1
+        plan = _generate_plan(category, name)
+        if _cacheable(category):
+            _GENERATED.add(category, plan)
+        return plan
+    except TypeError:
+        # Unhashable category
+        return _generate_plan(category, name)
+    plan.uses += 1
+    return plan
+
+def _generate_plan(category, name="object"):
+    """
+    @type: category: Optional[Validator, type, tuple[type]]
+    @type: name: str
+    @rtype: Plan
+    """
+    plan = compile(category, name)
+    if plan.test is _always_valid:
+        return plan
+    test = _Generator().function(category)
+    return Plan(category, test, plan._validate, plan.type_test)
+
+class _Generator(object):
+    """
+    Writes the source of a test function, value --> bool, for a category.
+    Checks are written as statements returning False; objects they need
+    are bound as globals of the function.
+    """
+    def __init__(self):
+        self.namespace = {'Iterable': collections.Iterable}
+        self.lines = []
+        self.names = 0
+
+    def function(self, category):
+        """
+        @type: category: Optional[Validator, type, tuple[type]]
+        @rtype: Callable[[Any], bool]
+        """
+        self.lines.append("def test(value):")
+        self.statements(category, "value", 1, 0)
+        self.lines.append("    return True")
+        source = "\n".join(self.lines) + "\n"
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        filename = str.format("<funkyvalidate generated {0}>", key[:12])
+        code = None if CODE_CACHE is None else CODE_CACHE.get(key)
+        if code is None:
+            code = six.moves.builtins.compile(source, filename, "exec")
+            if CODE_CACHE is not None:
+                CODE_CACHE.put(key, code)
+        six.exec_(code, self.namespace)
+        test = self.namespace['test']
+        test.source = source
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        return test
+
+    def statements(self, category, var, indent, depth):
+        """
+        Write the checks of `var` against `category`.
+        @type: category: Optional[Validator, type, tuple[type]]
+        @type: var: str
+        @type: indent: int
+        @type: depth: int
+        """
+        if category is None or category is Any:
+            return
+        elif hasattr(category, 'validate') or not isinstance(category, (type, tuple)):
+            self.fail(indent, "not {0}({1})", self.bind(compile(category).test), var)
+        elif isinstance(category, tuple):
+            self.fail(indent, "not isinstance({0}, {1})", var, self.bind(category))
+        elif is_ancestor(Union, category) and _hasattr(category, '_types'):
+            self.union(category, var, indent)
+        elif (is_ancestor(Tuple, category) and _hasattr(category, '_types') or
+              is_ancestor(Record, category) and isinstance(getattr(category, '_fields', None), tuple)):
+            elements = category._types if is_ancestor(Tuple, category) else category._fields
+            self.tuple(elements, var, indent, depth)
+        elif _is_nested(category) and depth < CODEGEN_DEPTH:
+            self.nested(category, var, indent, depth)
+        elif (_is_nested(category) or
+              is_ancestor(Record, category) and _hasattr(category, '_fields')):
+            self.fail(indent, "not {0}({1})", self.bind(compile(category).test), var)
+        elif type(category) is type:
+            cls = self.bind(category)
+            self.fail(indent, "type({0}) is not {1} and not isinstance({0}, {1})", var, cls)
+        else:
+            self.fail(indent, "not isinstance({0}, {1})", var, self.bind(category))
+
+    def union(self, category, var, indent):
+        terms = []
+        if category._plain_types:
+            terms.append(str.format("isinstance({0}, {1})", var, self.bind(category._plain_types)))
+        for _type in category._value_types:
+            terms.append(str.format("{0}({1})", self.bind(compile(_type).test), var))
+        self.fail(indent, "not ({0})", " or ".join(terms) or "False")
+
+    def tuple(self, elements, var, indent, depth):
+        self.fail(
+            indent, "type({0}) is not tuple and not isinstance({0}, tuple) or len({0}) != {1}",
+            var, len(elements)
+        )
+        for position, element in enumerate(elements):
+            if element is Any:
+                continue
+            element_var = self.variable()
+            self.write(indent, "{0} = {1}[{2}]", element_var, var, position)
+            self.statements(element, element_var, indent, depth)
+
+    def nested(self, category, var, indent, depth):
+        self.statements(category._outer, var, indent, depth)
+        self.fail(indent, "not isinstance({0}, Iterable)", var)
+        inner = compile(category._inner)
+        if inner.test is _always_valid:
+            return
+        elif inner.type_test is not None:
+            # Checked once per distinct type of element
+            self.fail(indent, "not {0}({1})", self.bind(inner.test_many), var)
+        else:
+            element_var = self.variable()
+            self.write(indent, "for {0} in {1}:", element_var, var)
+            self.statements(category._inner, element_var, indent + 1, depth + 1)
+
+    def fail(self, indent, condition, *arguments):
+        self.write(indent, "if " + condition + ":", *arguments)
+        self.write(indent + 1, "return False")
+
+    def write(self, indent, line, *arguments):
+        self.lines.append("    " * indent + str.format(line, *arguments))
+
+    def bind(self, obj):
+        """
+        @type: obj: Any
+        @rtype: str
+        """
+        label = getattr(obj, '__name__', type(obj).__name__)
+        name = self.variable("_" + "".join(
+            char if char.isalnum() else "_" for char in label
+        ) + "_")
+        self.namespace[name] = obj
+        return name
+
+    def variable(self, prefix="v"):
+        self.names += 1
+        return prefix + str(self.names)
+
+
+class CodeCache(object):
+    """
+    Code objects of generated tests, kept in one marshal file, so that
+    processes starting up can skip compiling their source. Entries are
+    keyed by a hash of the source - which is determined by the structure
+    of the spec, and by the version of this library that generated it.
+    The file is only read by the Python version which wrote it.
+    """
+    def __init__(self, path):
+        """
+        @type: path: str
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._codes = self._load()
+        self._changed = False
+
+    def get(self, key):
+        """
+        @type: key: str
+        @rtype: Optional[types.CodeType]
+        """
+        code = self._codes.get(key)
+        if code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return code
+
+    def put(self, key, code):
+        """
+        @type: key: str
+        @type: code: types.CodeType
+        """
+        self._codes[key] = code
+        self._changed = True
+
+    def save(self):
+        """
+        Write the cache, if it has changed. The file is replaced atomically,
+        so concurrent readers see either the old or the new version.
+        """
+        if not self._changed:
+            return
+        directory = os.path.dirname(self.path) or os.curdir
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        import tempfile
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as stream:
+                marshal.dump((_cache_header(), self._codes), stream)
+            getattr(os, 'replace', os.rename)(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self._changed = False
+
+    def _load(self):
+        """
+        @rtype: dict[str, types.CodeType]
+        """
+        try:
+            with open(self.path, 'rb') as stream:
+                header, codes = marshal.load(stream)
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            # Missing or unreadable
+            return {}
+        if header != _cache_header():
+            return {}
+        return codes
+
+    def __len__(self):
+        return len(self._codes)
+
+# Used by generate(), if set - see use_code_cache()
+CODE_CACHE = None
+
+def use_code_cache(directory):
+    """
+    Load generated code from, and add it to, the cache file in `directory`
+    for this version of Python. Call save() on the result to write it:
+        cache = use_code_cache('/var/cache/myservice')
+        ...   # generate() specs
+        cache.save()
+    @type: directory: str
+    @rtype: CodeCache
+    """
+    global CODE_CACHE  # pylint: disable=global-statement
+    filename = str.format("funkyvalidate-py{0}{1}.marshal", *sys.version_info[:2])
+    CODE_CACHE = CodeCache(os.path.join(directory, filename))
+    return CODE_CACHE
+
+def _cache_header():
+    return (sys.version, marshal.version)
+
+
+# ===================================
+# arrays.py
+# ===================================
+def _as_array(values):
+    """
+    `values`, if it is a numpy.ndarray, otherwise None.
+    NumPy is optional - if it has not been imported, nothing is an ndarray.
+    @type: values: Any
+    @rtype: Optional[numpy.ndarray]
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values
+    return None
+
+def _array_verdicts(plan, array):
+    """
+    Verdicts of `plan` for the elements of `array` (its rows, if it has
+    more than one dimension), worked out from the dtype or by vectorized
+    expressions rather than per element.
+
+    Value-dependent categories take part by providing a classmethod
+    _array_check_(array), which returns a boolean array of verdicts for
+    a 1-d array, or None if it cannot handle the array.
+
+    Returns None when the elements have to be checked one by one.
+    @type: plan: Plan
+    @type: array: numpy.ndarray
+    @rtype: Optional[Union[numpy.ndarray, numpy.bool_]]
+    """
+    if array.ndim == 0:
+        # Not iterable - leave it to the usual error
+        return None
+    if array.ndim > 1:
+        element_type = type(array)
+    elif array.dtype.hasobject:
+        return None
+    else:
+        element_type = array.dtype.type
+
+    if plan.type_test is not None:
+        # Every element shares the verdict. A numpy.bool_ scalar supports
+        # .all() and .argmin() like an array of them.
+        numpy = sys.modules['numpy']
+        return numpy.bool_(len(array) == 0 or plan.type_test(element_type))
+    check_array = getattr(plan.category, '_array_check_', None)
+    if array.ndim == 1 and check_array is not None:
+        return check_array(array)
+    return None
+
+
+# ===================================
+# parallel.py
+# ===================================
+# Collections shorter than this are checked serially, even if given workers
+PARALLEL_THRESHOLD = 10000
+
+def _is_parallel(workers, executor):
+    return workers is not None or executor is not None
+
+def _is_nested(category):
+    return (
+        isinstance(category, type) and
+        _hasattr(category, '_outer') and _hasattr(category, '_inner')
+    )
+
+def _check_parallel(plan, values, name="object",
+                    workers=None, executor=None, chunksize=None):
+    """
+    plan.check_many(), with the elements split into chunks of `chunksize`
+    and tested across processes. Chunks are merged back in index order, and
+    the first failing element is checked again here, so Failures match
+    those of serial mode.
+
+    `executor` may be anything with map() - a concurrent.futures.Executor,
+    or a multiprocessing.Pool. Otherwise a multiprocessing.Pool of `workers`
+    processes is started for the call. Generated spec classes are sent as
+    recipes to rebuild them; if `plan.category` still cannot be pickled,
+    the check runs serially.
+    @type: plan: Plan
+    @type: values: Iterable
+    @type: name: str
+    @type: workers: Optional[int]
+    @type: executor: Optional[concurrent.futures.Executor, multiprocessing.Pool]
+    @type: chunksize: Optional[int]
+    @rtype: Optional[Failure]
+    """
+    if plan.type_test is not None or _as_array(values) is not None:
+        # Already cheaper than sending the elements to other processes
+        return plan.check_many(values, name)
+    if not isinstance(values, collections.Sequence):
+        values = list(values)
+    if len(values) < PARALLEL_THRESHOLD:
+        return plan.check_many(values, name)
+    category = _portable(plan.category)
+    if not _picklable(category):
+        return plan.check_many(values, name)
+    # Only imported once needed, as it is slow to import
+    import multiprocessing
+    if chunksize is None:
+        chunks = 4 * (workers or multiprocessing.cpu_count())
+        chunksize = -(-len(values) // chunks)
+    tasks = (
+        (category, start, values[start:start + chunksize])
+        for start in six.moves.range(0, len(values), chunksize)
+    )
+    if executor is not None:
+        return _first_failure(plan, values, name, executor.map(_first_invalid, tasks))
+    pool = multiprocessing.Pool(workers)
+    try:
+        return _first_failure(plan, values, name, pool.imap(_first_invalid, tasks))
+    finally:
+        pool.terminate()
+
+def _first_failure(plan, values, name, indexes):
+    """
+    @type: plan: Plan
+    @type: values: Sequence
+    @type: name: str
+    @type: indexes: Iterable[Optional[int]]
+    @rtype: Optional[Failure]
+    """
+    for index in indexes:
+        if index is not None:
+            return plan.check(values[index], "{0}[{1}]".format(name, index))
+    return None
+
+def _first_invalid(task):
+    """
+    Index of the first invalid element in a chunk, or None.
+    Runs in the worker processes.
+    @type: task: tuple[Any, int, Sequence]
+    @rtype: Optional[int]
+    """
+    category, start, elements = task
+    test = compile(_rebuild(category)).test
+    for index, element in enumerate(elements, start):
+        if not test(element):
+            return index
+    return None
+
+class _Recipe(object):
+    """
+    Stands in for a generated spec class, which pickle cannot find by
+    name, when sending it to other processes: rebuilt as factory(*args).
+    """
+    def __init__(self, factory, *args):
+        """
+        @type: factory: Callable[..., type]
+        @type: args: tuple
+        """
+        self.factory = factory
+        self.args = args
+
+def _portable(category):
+    """
+    `category`, with the generated spec classes in it replaced by Recipes.
+    @type: category: Any
+    @rtype: Any
+    """
+    if isinstance(category, tuple):
+        return tuple(_portable(part) for part in category)
+    elif isinstance(category, dict):
+        return dict((key, _portable(part)) for key, part in six.iteritems(category))
+    elif not isinstance(category, type):
+        return category
+    namespace = vars(category)
+    if '_types' in namespace and is_ancestor(Union, category):
+        return _Recipe(Union, *_portable(namespace['_types']))
+    elif '_types' in namespace and is_ancestor(Tuple, category):
+        return _Recipe(Tuple, *_portable(namespace['_types']))
+    elif '_fields' in namespace:
+        return _Recipe(
+            Record, _portable(namespace['_fields']),
+            _portable(namespace['_optional']), namespace['_closed']
+        )
+    elif '_outer' in namespace and '_inner' in namespace:
+        return _Recipe(Nested, _portable(namespace['_outer']), _portable(namespace['_inner']))
+    return category
+
+def _rebuild(category):
+    """
+    Inverse of _portable(). Runs in the worker processes.
+    @type: category: Any
+    @rtype: Any
+    """
+    if isinstance(category, _Recipe):
+        return category.factory(*[_rebuild(arg) for arg in category.args])
+    elif isinstance(category, tuple):
+        return tuple(_rebuild(part) for part in category)
+    elif isinstance(category, dict):
+        return dict((key, _rebuild(part)) for key, part in six.iteritems(category))
+    return category
+
+def _picklable(obj):
+    """
+    @type: obj: Any
+    @rtype: bool
+    """
+    try:
+        six.moves.cPickle.dumps(obj, 2)
+    except Exception:  # pylint: disable=broad-except
+        # PicklingError, or TypeError / AttributeError for some objects
+        return False
+    return True
+
+
+# ===================================
+# sampling.py
+# ===================================
+class Sample(object):
+    """
+    Policy for checking only part of a collection: its first and last
+    elements, and `size` more chosen at random - or, if `stratified`, one
+    from each of `size` equal stretches of it. With a `seed`, the same
+    elements are chosen every time.
+
+    A Sample holds no state between checks, so one may be shared by
+    concurrent checks. count() gives the number of elements a valid
+    collection has checked, and the Failure of an invalid one records
+    how many were checked in `checked`.
+    """
+    def __init__(self, size, seed=None, stratified=False):
+        """
+        @type: size: int
+        @type: seed: Optional[Hashable]
+        @type: stratified: bool
+        """
+        if size < 0:
+            raise ValueError(str.format(
+                "'size' must be a non-negative integer, not {0}.", size
+            ))
+        self.size = size
+        self.seed = seed
+        self.stratified = stratified
+
+    def indexes(self, length):
+        """
+        Sorted indexes to check, in a collection of `length` elements.
+        @type: length: int
+        @rtype: list[int]
+        """
+        if length <= self.size + 2:
+            return list(six.moves.range(length))
+        import random
+        rng = random.Random(self.seed)
+        # Chosen from the interior, between the first and last elements
+        interior = length - 2
+        if self.stratified:
+            chosen = [
+                1 + rng.randrange(
+                    interior * stratum // self.size,
+                    interior * (stratum + 1) // self.size
+                )
+                for stratum in six.moves.range(self.size)
+            ]
+        else:
+            chosen = sorted(1 + index for index in rng.sample(six.moves.range(interior), self.size))
+        return [0] + chosen + [length - 1]
+
+    def count(self, length):
+        """
+        Number of elements checked in a collection of `length` elements.
+        @type: length: int
+        @rtype: int
+        """
+        return min(length, self.size + 2)
+
+    def __repr__(self):
+        return str.format(
+            "Sample({0}, seed={1!r}, stratified={2})",
+            self.size, self.seed, self.stratified
+        )
+
+def as_sample(sample):
+    """
+    @type: sample: Union[int, Sample]
+    @rtype: Sample
+    """
+    if isinstance(sample, Sample):
+        return sample
+    return Sample(sample)
+
+def _check_sample(plan, values, name, sample):
+    """
+    plan.check_many() over the elements of `values` chosen by `sample`.
+    Sequences are indexed directly; other iterables are read into a list.
+    A Failure's `checked` is the number of elements checked, up to and
+    including the invalid one.
+    @type: plan: Plan
+    @type: values: Iterable
+    @type: name: str
+    @type: sample: Sample
+    @rtype: Optional[Failure]
+    """
+    if not isinstance(values, collections.Sequence) and _as_array(values) is None:
+        values = list(values)
+    test = plan.test
+    for checked, index in enumerate(sample.indexes(len(values)), 1):
+        if not test(values[index]):
+            failure = plan.check(values[index], name, (index, ))
+            failure.checked = checked
+            return failure
+    return None
+
+
+# ===================================
+# asynchronous.py
+# ===================================
+# Default number of threads checking elements at once, for acheck_many()
+ASYNC_LIMIT = 32
+
+def avalidate(values, category=None, name="object",
+              limit=ASYNC_LIMIT, executor=None, loop=None):
+    """
+    Awaitable parallel of validate_many(), for asyncio code. The checks of
+    the elements run in a thread pool, so blocking checks (such as
+    ExistingFile and ExistingDirectory, which stat the filesystem) do not
+    stall the event loop:
+        paths = await avalidate(paths, ExistingFile)
+    See acheck_many().
+    @type: values: Iterable
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: limit: int
+    @type: executor: Optional[concurrent.futures.Executor]
+    @type: loop: Optional[asyncio.AbstractEventLoop]
+    @rtype: asyncio.Future
+    """
+    if loop is None:
+        loop = _asyncio().get_event_loop()
+    result = _future(loop)
+    def finish(checked):
+        if result.cancelled():
+            return
+        if checked.cancelled():
+            result.cancel()
+        elif checked.exception() is not None:
+            result.set_exception(checked.exception())
+        elif checked.result() is not None:
+            result.set_exception(checked.result().exception())
+        else:
+            result.set_result(values)
+    acheck_many(
+        values, category, name, limit=limit, executor=executor, loop=loop
+    ).add_done_callback(finish)
+    return result
+
+def acheck_many(values, category=None, name="object",
+                limit=ASYNC_LIMIT, executor=None, loop=None):
+    """
+    Awaitable parallel of check_many(). Every element is checked at once,
+    in `executor`, or else in a pool of `limit` threads - which bounds how
+    many checks run concurrently. Resolves to the Failure of the first
+    invalid element, by index, or None.
+
+    Requires an asyncio event loop (or trollius, on Python 2), and
+    concurrent.futures unless `executor` is given.
+    @type: values: Iterable
+    @type: category: Optional[Validator, type]
+    @type: name: Optional[str]
+    @type: limit: int
+    @type: executor: Optional[concurrent.futures.Executor]
+    @type: loop: Optional[asyncio.AbstractEventLoop]
+    @rtype: asyncio.Future
+    """
+    if loop is None:
+        loop = _asyncio().get_event_loop()
+    result = _future(loop)
+    try:
+        plan = compile(category, name)
+    except ValidationError as exc:
+        result.set_result(Failure(category, type, name, exc))
+        return result
+    if not isinstance(values, collections.Iterable):
+        result.set_result(Failure(values, collections.Iterable, name))
+        return result
+    values = list(values)
+    if plan.type_test is not None or not values:
+        # No blocking calls to offload
+        result.set_result(plan.check_many(values, name))
+        return result
+
+    owned = executor is None
+    if owned:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(limit)
+    checks = [
+        loop.run_in_executor(executor, _check_at, plan, value, name, index)
+        for index, value in enumerate(values)
+    ]
+    pending = [len(checks)]
+    def finish(_):
+        pending[0] -= 1
+        if pending[0]:
+            return
+        if owned:
+            executor.shutdown(wait=False)
+        if not result.cancelled():
+            _first_outcome(checks, result)
+    for check in checks:
+        check.add_done_callback(finish)
+    return result
+
+def _first_outcome(checks, result):
+    """
+    Resolve `result` with the outcome of the first of `checks`, by index,
+    which was cancelled, raised, or found a Failure - or else with None.
+    @type: checks: list[asyncio.Future]
+    @type: result: asyncio.Future
+    """
+    for check in checks:
+        if check.cancelled():
+            result.cancel()
+            return
+        elif check.exception() is not None:
+            result.set_exception(check.exception())
+            return
+        elif check.result() is not None:
+            result.set_result(check.result())
+            return
+    result.set_result(None)
+
+def _check_at(plan, value, name, index):
+    """
+    Check of one element, run in the thread pool by acheck_many().
+    @type: plan: Plan
+    @type: value: Any
+    @type: name: str
+    @type: index: int
+    @rtype: Optional[Failure]
+    """
+    if plan.test(value):
+        return None
+    return plan.check(value, "{0}[{1}]".format(name, index))
+
+def _future(loop):
+    """
+    A Future of `loop`. Made by the loop, where it can, so that only
+    loops without create_future() - as in trollius - need asyncio.
+    @type: loop: asyncio.AbstractEventLoop
+    @rtype: asyncio.Future
+    """
+    create_future = getattr(loop, 'create_future', None)
+    if create_future is not None:
+        return create_future()
+    return _asyncio().Future(loop=loop)
+
+def _asyncio():
+    """
+    asyncio is optional - it is only imported once asked for.
+    @rtype: module
+    """
+    try:
+        import asyncio
+    except ImportError:  # Python 2
+        import trollius as asyncio
+    return asyncio
+
+
+# ===================================
+# instrument.py
+# ===================================
+class SpecStats(object):
+    """
+    Counters for checks of one spec, by one hook, with a histogram of
+    their latencies in power-of-two buckets of nanoseconds.
+    """
+    __slots__ = ('checks', 'failures', 'total', 'buckets')
+
+    def __init__(self):
+        self.checks = 0
+        self.failures = 0
+        self.total = 0.0
+        self.buckets = [0] * 64
+
+    def add(self, elapsed, checks=1, failures=0):
+        """
+        @type: elapsed: float
+        @type: checks: int
+        @type: failures: int
+        """
+        self.checks += checks
+        self.failures += failures
+        self.total += elapsed
+        self.buckets[min(int(elapsed * 1e9).bit_length(), 63)] += 1
+
+    def percentile(self, fraction):
+        """
+        Upper bound, in seconds, of the latency of `fraction` of the samples.
+        @type: fraction: float
+        @rtype: float
+        """
+        samples = sum(self.buckets)
+        if not samples:
+            return 0.0
+        needed = fraction * samples
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= needed:
+                break
+        return (2 ** bucket) / 1e9
+
+    def summary(self):
+        """
+        @rtype: dict[str, float]
+        """
+        samples = sum(self.buckets)
+        return {
+            'checks': self.checks,
+            'failures': self.failures,
+            'total': self.total,
+            'mean': self.total / samples if samples else 0.0,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+        }
+
+
+class Recorder(object):
+    """
+    Thread-safe SpecStats, by spec and hook. See instrument().
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (spec, hook) --> SpecStats
+        self._stats = {}
+
+    def record(self, spec, hook, elapsed, checks=1, failures=0):
+        """
+        @type: spec: Any
+        @type: hook: str
+        @type: elapsed: float
+        @type: checks: int
+        @type: failures: int
+        """
+        key = (_stats_key(spec), hook)
+        with self._lock:
+            try:
+                entry = self._stats[key]
+            except KeyError:
+                entry = self._stats[key] = SpecStats()
+            entry.add(elapsed, checks, failures)
+
+    def time(self, hook, spec, function, *arguments):
+        """
+        Call `function`, recording it as a failure if it raises ValidationError.
+        @type: hook: str
+        @type: spec: Any
+        @type: function: Callable
+        @rtype: Any
+        """
+        start = timeit.default_timer()
+        try:
+            result = function(*arguments)
+        except ValidationError:
+            self.record(spec, hook, timeit.default_timer() - start, failures=1)
+            raise
+        self.record(spec, hook, timeit.default_timer() - start)
+        return result
+
+    def predicate(self, hook, spec, function, *arguments):
+        """
+        Call `function`, recording it as a failure if it returns false.
+        @type: hook: str
+        @type: spec: Any
+        @type: function: Callable[..., bool]
+        @rtype: bool
+        """
+        start = timeit.default_timer()
+        verdict = function(*arguments)
+        self.record(spec, hook, timeit.default_timer() - start, failures=int(not verdict))
+        return verdict
+
+    def snapshot(self):
+        """
+        @rtype: dict[Any, dict[str, dict[str, float]]]
+        """
+        with self._lock:
+            entries = [(key, entry.summary()) for key, entry in six.iteritems(self._stats)]
+        specs = {}
+        for (spec, hook), summary in entries:
+            specs.setdefault(spec, {})[hook] = summary
+        return specs
+
+def _stats_key(spec):
+    try:
+        hash(spec)
+    except TypeError:
+        return repr(spec)
+    return spec
+
+# Set while instrument() is active. Hooks only check this is None.
+_RECORDER = None
+# The Recorder of the latest instrument(), for stats() after it ends
+_LAST_RECORDER = None
+_INSTRUMENT_LOCK = threading.Lock()
+_INSTRUMENT_DEPTH = [0]
+
+@contextlib.contextmanager
+def instrument():
+    """
+    Record checks made within the block - by validate(), meets(),
+    isinstance() and issubclass() on CheckerMeta classes (ValueMeta's and
+    funkyvalidate.valuemeta's), and promises() - for stats(). Outside of
+    it, the hooks cost one comparison with None, and CheckerMeta's checks
+    are not wrapped at all.
+        with instrument():
+            handle(request)
+        stats()['specs'][Positive]['isinstance']['p99']
+    Blocks may be nested, and are shared by all threads.
+    @rtype: Iterator[Recorder]
+    """
+    global _RECORDER, _LAST_RECORDER  # pylint: disable=global-statement
+    with _INSTRUMENT_LOCK:
+        if _INSTRUMENT_DEPTH[0] == 0:
+            _LAST_RECORDER = Recorder()
+            CheckerMeta.__instancecheck__ = _timed_instancecheck
+            CheckerMeta.__subclasscheck__ = _timed_subclasscheck
+            _RECORDER = _LAST_RECORDER
+        _INSTRUMENT_DEPTH[0] += 1
+        recorder = _RECORDER
+    try:
+        yield recorder
+    finally:
+        with _INSTRUMENT_LOCK:
+            _INSTRUMENT_DEPTH[0] -= 1
+            if _INSTRUMENT_DEPTH[0] == 0:
+                _RECORDER = None
+                CheckerMeta.__instancecheck__ = _CHECKERMETA_CHECKS[0]
+                CheckerMeta.__subclasscheck__ = _CHECKERMETA_CHECKS[1]
+
+def active_recorder():
+    """
+    The Recorder of the active instrument() block, or None.
+    @rtype: Optional[Recorder]
+    """
+    return _RECORDER
+
+def stats():
+    """
+    'specs': counters and latencies, by spec and then by hook, from the
+    active or latest instrument() block. 'caches': sizes and hit rates
+    of the internal caches.
+    @rtype: dict[str, dict]
+    """
+    recorder = _LAST_RECORDER
+    registry = SPECS.stats()
+    hits, misses = _CONFORMANCE_LOOKUPS
+    caches = {
+        'specs': dict(registry, hit_rate=_hit_rate(registry['hits'], registry['misses'])),
+        'plans': _PLANS.stats(),
+        'generated': _GENERATED.stats(),
+        'meets': {
+            'count': len(_CLASS_CONFORMANCE) + len(_INSTANCE_CONFORMANCE),
+            'hits': hits, 'misses': misses, 'hit_rate': _hit_rate(hits, misses),
+        },
+    }
+    if CODE_CACHE is not None:
+        caches['code'] = {
+            'count': len(CODE_CACHE), 'hits': CODE_CACHE.hits, 'misses': CODE_CACHE.misses,
+            'hit_rate': _hit_rate(CODE_CACHE.hits, CODE_CACHE.misses),
+        }
+    return {
+        'specs': recorder.snapshot() if recorder is not None else {},
+        'caches': caches,
+    }
+
+_CHECKERMETA_CHECKS = (
+    CheckerMeta.__dict__['__instancecheck__'], CheckerMeta.__dict__['__subclasscheck__']
+)
+
+def _timed_instancecheck(cls, instance):
+    recorder = _RECORDER
+    if recorder is None:
+        # Instrumentation ended during this call
+        return cls._instance_checker(instance)
+    return recorder.predicate('isinstance', cls, cls._instance_checker, instance)
+
+def _timed_subclasscheck(cls, subclass):
+    recorder = _RECORDER
+    if recorder is None:
+        return cls._subclass_checker(subclass)
+    return recorder.predicate('issubclass', cls, cls._subclass_checker, subclass)
+
+
+# ===================================
+# profile.py
+# ===================================
+# Spec trees deeper than this are timed as a whole, below it
+PROFILE_DEPTH = 64
+
+# Elements of a Nested value traced one by one; the rest are timed as a whole
+PROFILE_ELEMENTS = 16
+
+# Most of the running time a Profile spends in traced calls
+PROFILE_BUDGET = 0.01
+
+# Set by a running Profile when a sample is due: the next validate() or
+# check() is then traced. Otherwise, those only compare this with None.
+_PROFILER = None
+
+class Profile(object):
+    """
+    Sampling profiler of validate() and check(). Every `interval` seconds,
+    a background thread arms it, and the next call is traced through its
+    spec tree, with the time taken by each node - members of a Union,
+    positions of a Tuple, elements of a Nested, fields of a Record, down to
+    the types and user __instancecheck__ predicates - attributed to it.
+
+    Calls in between run untraced, so it can run continuously. Tracing a
+    node costs some twenty times checking it, so only the first
+    PROFILE_ELEMENTS elements of a Nested value are traced, and the rest
+    are timed together, under their node. Arming is also held back after
+    a long trace, so traced calls take at most PROFILE_BUDGET of the
+    running time - `elapsed` is the time they have taken.
+
+    The trace is the call's only test of its value, and gives its result,
+    so iterators are consumed and predicates run just once, as without the
+    profiler. Validators whose __validate__ returns the value to use, and
+    the elements of collections checked with `sample` or `workers`, are
+    not traced.
+    """
+    def __init__(self, interval=0.1):
+        """
+        @type: interval: float
+        """
+        self.interval = interval
+        self.samples = 0
+        self.elapsed = 0.0
+        self._last = 0.0
+        # Not armed again before this (timeit.default_timer()) time
+        self._resume = 0.0
+        # path of node labels --> seconds spent in it, over all samples
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='funkyvalidate-profile')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        global _PROFILER  # pylint: disable=global-statement
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if _PROFILER is self:
+            _PROFILER = None
+
+    def _run(self):
+        global _PROFILER  # pylint: disable=global-statement
+        while not self._stopped.wait(self.interval):
+            # Held back while a trace runs, and after it, to keep to the budget
+            while timeit.default_timer() < self._resume:
+                if self._stopped.wait(min(self._resume - timeit.default_timer(), self.interval)):
+                    return
+            _PROFILER = self
+
+    def trace(self, entry, plan, value):
+        """
+        Test `value` with `plan`, tracing it as a call of `entry`
+        ('validate' or 'check'). Exceptions from the test are raised as
+        they would be without the trace.
+        @type: entry: str
+        @type: plan: Plan
+        @type: value: Any
+        @rtype: bool
+        """
+        global _PROFILER  # pylint: disable=global-statement
+        # Disarmed first, so calls made by the trace are not sampled
+        _PROFILER = None
+        totals = {}
+        self._resume = float('inf')
+        start = timeit.default_timer()
+        try:
+            verdict = _trace(plan.category, value, (entry, ), "", totals, 0)
+        finally:
+            end = timeit.default_timer()
+            self._last = end - start
+            self._resume = end + self._last / PROFILE_BUDGET
+        with self._lock:
+            self.samples += 1
+            self.elapsed += self._last
+            for path, elapsed in six.iteritems(totals):
+                self._totals[path] = self._totals.get(path, 0.0) + elapsed
+        return verdict
+
+    def collapsed(self):
+        """
+        Self time of each node, in microseconds, in the collapsed-stack
+        format of flame graph tools: 'validate;Nestedlist;[i] int 1234'.
+        @rtype: list[str]
+        """
+        with self._lock:
+            totals = dict(self._totals)
+        own = dict(totals)
+        for path, elapsed in six.iteritems(totals):
+            if path[:-1] in own:
+                own[path[:-1]] -= elapsed
+        return sorted(
+            str.format("{0} {1}", ";".join(path), int(round(elapsed * 1e6)))
+            for path, elapsed in six.iteritems(own)
+        )
+
+    def dump(self, stream):
+        """
+        Write collapsed() to `stream`, one stack per line.
+        @type: stream: file
+        """
+        for line in self.collapsed():
+            stream.write(line + "\n")
+
+@contextlib.contextmanager
+def profile(interval=0.1):
+    """
+    Run a Profile while in the block:
+        with profile() as profiler:
+            serve()
+        profiler.dump(open('validate.folded', 'w'))
+    @type: interval: float
+    @rtype: Iterator[Profile]
+    """
+    profiler = Profile(interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+def _trace(category, value, path, prefix, totals, depth):
+    """
+    Test `value` against `category`, adding the time taken to `totals`
+    under `path` extended by the label of this node.
+    @type: category: Optional[Validator, type, tuple[type]]
+    @type: value: Any
+    @type: path: tuple[str]
+    @type: prefix: str
+    @type: totals: dict[tuple[str], float]
+    @type: depth: int
+    @rtype: bool
+    """
+    path = path + (prefix + _spec_label(category), )
+    start = timeit.default_timer()
+    if depth >= PROFILE_DEPTH or not isinstance(category, type) or category is Any:
+        verdict = compile(category).test(value)
+    else:
+        verdict = _trace_children(category, value, path, totals, depth + 1)
+    totals[path] = totals.get(path, 0.0) + timeit.default_timer() - start
+    return verdict
+
+def _trace_children(category, value, path, totals, depth):
+    """
+    @type: category: type
+    @rtype: bool
+    """
+    if is_ancestor(Union, category) and _hasattr(category, '_types'):
+        for member in category._plain_types + category._value_types:
+            if _trace(member, value, path, "", totals, depth):
+                return True
+        return False
+    elif (is_ancestor(Tuple, category) and _hasattr(category, '_types') or
+          is_ancestor(Record, category) and isinstance(getattr(category, '_fields', None), tuple)):
+        elements = category._types if is_ancestor(Tuple, category) else category._fields
+        if not isinstance(value, tuple) or len(value) != len(elements):
+            return False
+        for position, (element, spec) in enumerate(zip(value, elements)):
+            if not _trace(spec, element, path, str.format("[{0}] ", position), totals, depth):
+                return False
+        return True
+    elif _is_nested(category):
+        if not (_trace(category._outer, value, path, "", totals, depth) and
+                isinstance(value, collections.Iterable)):
+            return False
+        elements = iter(value)
+        for element in itertools.islice(elements, PROFILE_ELEMENTS):
+            if not _trace(category._inner, element, path, "[i] ", totals, depth):
+                return False
+        node = path + ("[i] " + _spec_label(category._inner), )
+        start = timeit.default_timer()
+        verdict = compile(category._inner).test_many(elements)
+        totals[node] = totals.get(node, 0.0) + timeit.default_timer() - start
+        return verdict
+    elif is_ancestor(Record, category) and _hasattr(category, '_fields'):
+        if not isinstance(value, collections.Mapping):
+            return False
+        keys = frozenset(value)
+        if not keys.issuperset(category._fields):
+            return False
+        if category._closed and not keys.issubset(set(category._fields).union(category._optional)):
+            return False
+        for fields in (category._fields, category._optional):
+            for key, spec in six.iteritems(fields):
+                if key in keys and not _trace(spec, value[key], path,
+                                              str.format("[{0!r}] ", key), totals, depth):
+                    return False
+        return True
+    return compile(category).test(value)
+
+def _spec_label(category):
+    """
+    Name of a node, for Profile.collapsed().
+    @type: category: Any
+    @rtype: str
+    """
+    if isinstance(category, tuple):
+        return "(" + ", ".join(_spec_label(member) for member in category) + ")"
+    elif not isinstance(category, type):
+        return type(category).__name__
+    elif is_ancestor(Union, category) and _hasattr(category, '_types'):
+        return "Union(" + ", ".join(sorted(_spec_label(member) for member in category._types)) + ")"
+    elif is_ancestor(Tuple, category) and _hasattr(category, '_types'):
+        return "Tuple" + _spec_label(tuple(category._types))
+    return category.__name__.replace(";", ",")
+
+
 # ===================================
 # Speculative
 # ===================================
@@ -542,13 +3120,27 @@ def Nested(category, inner):
     False
     """
     # @todo: check category & inner: Union[type, tuple[type]]
+    return intern_spec(
+        (Nested, category, inner),
+        lambda: _nested_class(category, inner)
+    )
 
+def _nested_class(category, inner):
+    """
+    @type: category: type
+    @type: inner: Optional[Validator, type, tuple[type]]
+    @rtype: type
+    """
     class NestedClass(ValueABC):
         _outer = category
         _inner = inner
         @classmethod
         def __instancecheck__(cls, instance):
-            return is_valid(instance, category=cls._outer, inner=cls._inner)
+            try:
+                return compile(cls).test(instance)
+            except ValidationError:
+                # Malformed inner tuple of types
+                return False
 
         @classmethod
         def __subclasscheck__(cls, subclass):
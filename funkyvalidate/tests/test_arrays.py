@@ -0,0 +1,49 @@
+"""
+"""
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from funkyvalidate import is_valid_many, check_many, Nested, Optional, Any
+from funkyvalidate.examples.examples import PositiveInteger
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class ArrayTests(unittest.TestCase):
+    def test_dtype(self):
+        integers = numpy.arange(10)
+        self.assertTrue(is_valid_many(integers, numpy.integer))
+        self.assertTrue(is_valid_many(integers, Optional(numpy.integer)))
+        self.assertTrue(is_valid_many(integers, Any))
+        self.assertFalse(is_valid_many(integers, float))
+        self.assertTrue(is_valid_many(numpy.arange(0), float))
+
+    def test_failure_index(self):
+        failure = check_many(numpy.arange(3.0), numpy.integer, name='values')
+        self.assertEqual(failure.name, 'values[0]')
+
+    def test_rows(self):
+        matrix = numpy.zeros((3, 2))
+        self.assertTrue(is_valid_many(matrix, numpy.ndarray))
+        self.assertTrue(isinstance(matrix, Nested(numpy.ndarray, numpy.ndarray)))
+
+    def test_vectorized_predicate(self):
+        integers = numpy.arange(1, 1001)
+        self.assertTrue(is_valid_many(integers, PositiveInteger))
+        integers[500] = -3
+        self.assertFalse(is_valid_many(integers, PositiveInteger))
+        failure = check_many(integers, PositiveInteger)
+        self.assertEqual((failure.name, failure.value), ('object[500]', -3))
+        self.assertFalse(is_valid_many(numpy.ones(3), PositiveInteger))
+
+    def test_object_dtype(self):
+        objects = numpy.array([1, 'a', None], dtype=object)
+        self.assertEqual(check_many(objects, int).name, 'object[1]')
+        self.assertEqual(check_many(objects, PositiveInteger).name, 'object[1]')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+"""
+import os
+import unittest
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+from funkyvalidate import avalidate, acheck_many, ValidationError, ValueABC
+from funkyvalidate.examples.existing_file import ExistingFile
+from funkyvalidate.examples.existing_directory import ExistingDirectory
+
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+test_init_file = os.path.join(test_dir, '__init__.py')
+
+
+@unittest.skipIf(asyncio is None, "asyncio is not available")
+class AsyncTests(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_future(self, future):
+        return self.loop.run_until_complete(future)
+
+    def test_avalidate(self):
+        paths = [test_init_file] * 100
+        result = self.run_future(avalidate(paths, ExistingFile, loop=self.loop))
+        self.assertIs(result, paths)
+        directories = [test_dir, test_dir]
+        self.assertIs(
+            self.run_future(avalidate(directories, ExistingDirectory, loop=self.loop)),
+            directories
+        )
+
+    def test_failure_in_index_order(self):
+        paths = [test_init_file, test_dir, 'nonexistant', test_init_file]
+        with self.assertRaises(ValidationError) as context:
+            self.run_future(avalidate(paths, ExistingFile, name='paths', loop=self.loop))
+        self.assertIn("'paths[1]'", str(context.exception))
+
+    def test_acheck_many(self):
+        self.assertIsNone(self.run_future(acheck_many([], ExistingFile, loop=self.loop)))
+        failure = self.run_future(acheck_many([1, 'a'], int, loop=self.loop))
+        self.assertEqual(failure.name, 'object[1]')
+        failure = self.run_future(acheck_many(12, ExistingFile, loop=self.loop))
+        self.assertEqual(failure.value, 12)
+
+
+class ImmediateFuture(object):
+    """The part of asyncio.Future which acheck_many() uses, without a loop."""
+    def __init__(self):
+        self._done = self._cancelled = False
+        self._result = self._exception = None
+        self._callbacks = []
+
+    def set_result(self, result):
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._finish()
+
+    def cancel(self):
+        self._cancelled = True
+        self._finish()
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self):
+        return self._exception
+
+    def add_done_callback(self, callback):
+        if self._done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self):
+        self._done = True
+        for callback in self._callbacks:
+            callback(self)
+
+
+class SynchronousLoop(object):
+    """Stands in for an event loop, running each check as it is submitted."""
+    def __init__(self):
+        self.calls = 0
+
+    def create_future(self):
+        return ImmediateFuture()
+
+    def run_in_executor(self, executor, function, *args):
+        self.calls += 1
+        future = ImmediateFuture()
+        try:
+            future.set_result(function(*args))
+        except Exception as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+        return future
+
+
+class SynchronousTests(unittest.TestCase):
+    """acheck_many() and avalidate(), driven without asyncio."""
+    def setUp(self):
+        self.loop = SynchronousLoop()
+
+    def check(self, values, category, **kwargs):
+        future = acheck_many(values, category, loop=self.loop, executor=object(), **kwargs)
+        self.assertTrue(future.done())
+        return future.result()
+
+    def test_valid(self):
+        self.assertIsNone(self.check([test_init_file] * 3, ExistingFile))
+        self.assertEqual(self.loop.calls, 3)
+        paths = [test_dir]
+        future = avalidate(paths, ExistingDirectory, loop=self.loop, executor=object())
+        self.assertIs(future.result(), paths)
+
+    def test_failure_in_index_order(self):
+        failure = self.check([test_init_file, test_dir, 'nonexistant'], ExistingFile, name='paths')
+        self.assertEqual(failure.name, 'paths[1]')
+        future = avalidate(['nonexistant'], ExistingFile, loop=self.loop, executor=object())
+        self.assertRaises(ValidationError, future.result)
+
+    def test_without_blocking_checks(self):
+        self.assertIsNone(self.check([], ExistingFile))
+        self.assertEqual(self.check([1, 'a'], int).name, 'object[1]')
+        self.assertEqual(self.check(12, ExistingFile).value, 12)
+        self.assertEqual(self.loop.calls, 0)
+
+    def test_exception(self):
+        class Broken(ValueABC):
+            @classmethod
+            def __instancecheck__(cls, instance):
+                raise RuntimeError(instance)
+        future = acheck_many([1], Broken, loop=self.loop, executor=object())
+        self.assertIsInstance(future.exception(), RuntimeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
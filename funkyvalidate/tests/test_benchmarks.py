@@ -0,0 +1,67 @@
+"""
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import six
+
+from funkyvalidate import benchmarks
+from funkyvalidate.benchmarks.cases import cases
+
+
+def stats(mean, stdev):
+    return {'mean': mean, 'stdev': stdev, 'min': mean, 'max': mean, 'samples': 5}
+
+
+class CompareTests(unittest.TestCase):
+    def test_regressions(self):
+        baseline = {'a': stats(100.0, 1.0), 'b': stats(100.0, 1.0), 'c': stats(100.0, 10.0)}
+        results = {'a': stats(80.0, 1.0), 'b': stats(95.0, 1.0), 'c': stats(80.0, 10.0),
+                   'd': stats(1.0, 0.0)}
+        self.assertEqual(benchmarks.compare(baseline, results), [('a', 100.0, 80.0)])
+        self.assertEqual(benchmarks.compare(baseline, results, tolerance=0.3), [])
+
+
+class RunTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stdout, sys.stdout = sys.stdout, six.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        shutil.rmtree(self.directory)
+
+    def test_cases(self):
+        names = [case.name for case in cases()]
+        self.assertEqual(len(names), len(set(names)))
+        for name in ['validate Nested size=1000 invalid=50%', 'meets InterfaceType size=10 invalid=0%',
+                     'isinstance Any size=10 invalid=0%']:
+            self.assertIn(name, names)
+
+    def test_measure(self):
+        case = benchmarks.Case('noop', lambda: None, 10)
+        result = benchmarks.measure(case, repeat=3, min_time=0.001)
+        self.assertEqual(result['samples'], 3)
+        self.assertTrue(result['min'] <= result['mean'] <= result['max'])
+
+    def test_main(self):
+        path = os.path.join(self.directory, 'baseline.json')
+        arguments = ['--filter', 'is_valid Tuple size=10 ', '--repeat', '2', '--min-time', '0.001']
+        self.assertEqual(benchmarks.main(arguments + ['--save', path]), 0)
+        self.assertEqual(
+            sorted(benchmarks.load(path)),
+            ['is_valid Tuple size=10 invalid=0%', 'is_valid Tuple size=10 invalid=50%']
+        )
+        self.assertIn('ops/s', sys.stdout.getvalue())
+        faster = dict((name, stats(result['mean'] * 100, 0.0))
+                      for name, result in benchmarks.load(path).items())
+        benchmarks.save(faster, path)
+        self.assertEqual(benchmarks.main(arguments + ['--compare', path]), 1)
+        self.assertIn('REGRESSION', sys.stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+"""
+import collections
+import itertools
+import unittest
+
+from funkyvalidate import ValidationError, Failure, MappingKey, Sample, ValueABC
+from funkyvalidate.clever_validate import (
+    validate, is_valid, check, check_all, validate_sequence, validate_mapping, promises,
+    check_sequence, check_mapping
+)
+
+
+class Negative(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, int) and instance < 0
+
+
+class CheckTests(unittest.TestCase):
+    def test_sequence(self):
+        self.assertIsNone(check([1, 2], list, sequence=int))
+        failure = check([1, 'b'], list, sequence=int)
+        self.assertIsInstance(failure, Failure)
+        self.assertEqual(failure.message, "'object[1]' should be type int, not str.")
+        self.assertIsInstance(check(12, int, sequence=int), Failure)
+
+    def test_mapping(self):
+        self.assertIsNone(check({'a': 1}, dict, mapping=(str, int)))
+        failure = check({'a': 'b'}, dict, mapping=(str, int))
+        self.assertEqual(failure.message, "'object[a]' should be type int, not str.")
+        failure = check({1: 1}, dict, mapping=(str, int))
+        self.assertEqual(failure.message, "'object key '1'' should be type str, not int.")
+        self.assertRaises(TypeError, check, {}, dict, mapping=(str, ))
+
+    def test_large_mapping(self):
+        """Failures are reported in iteration order, whichever check finds them."""
+        mapping = collections.OrderedDict((str(key), key) for key in range(1000))
+        self.assertIsNone(check(mapping, dict, mapping=(str, (int, Negative))))
+        mapping['500'] = None
+        mapping[7] = 7
+        failure = check(mapping, dict, mapping=(str, int))
+        self.assertEqual(failure.name, "object[500]")
+        failure = check(mapping, dict, mapping=(str, Negative))
+        self.assertEqual(failure.name, "object[0]")
+        self.assertIsInstance(check(mapping, dict, mapping=(str, (int, str))), Failure)
+
+    def test_iterator(self):
+        self.assertIsNone(check(iter([1]), object, iterator=int))
+        self.assertIsInstance(check([1], object, iterator=int), Failure)
+
+    def test_is_valid(self):
+        self.assertTrue(is_valid([1, 2], list, sequence=int))
+        self.assertFalse(is_valid([1, 'b'], list, sequence=int))
+        self.assertFalse(is_valid({'a': 'b'}, dict, mapping=(str, int)))
+
+
+class CheckAllTests(unittest.TestCase):
+    def test_sequence(self):
+        self.assertEqual(check_all([1, 2], list, sequence=int), [])
+        failures = check_all([1, 'b', 'c'], list, sequence=int)
+        self.assertEqual([failure.path for failure in failures], [(1, ), (2, )])
+
+    def test_mapping(self):
+        failures = check_all({'a': 'b', 1: 2}, dict, name='record', mapping=(str, int))
+        self.assertEqual(
+            set(failure.path for failure in failures),
+            set([(MappingKey(1), ), ('a', )])
+        )
+        self.assertEqual(
+            set(failure.name for failure in failures),
+            set(["record key '1'", "record[a]"])
+        )
+
+    def test_outer(self):
+        self.assertEqual(len(check_all(12, str, sequence=int)), 2)
+
+
+class ValidateTests(unittest.TestCase):
+    def test_sequence(self):
+        self.assertEqual(validate_sequence([1, 2], int), [1, 2])
+        with self.assertRaises(ValidationError) as context:
+            validate_sequence([1, 'b'], int)
+        self.assertEqual(
+            str(context.exception), "'object[1]' should be type int, not str."
+        )
+
+    def test_mapping(self):
+        self.assertEqual(validate_mapping({'a': 1}, (str, int)), {'a': 1})
+        self.assertRaises(ValidationError, validate_mapping, {'a': 'b'}, (str, int))
+        self.assertRaises(ValidationError, validate, {'a': 'b'}, dict, mapping=(str, int))
+
+
+class PromisesTests(unittest.TestCase):
+    def test_deferred(self):
+        stream = promises(iter([1, 2, 'c']), int, name='values')
+        self.assertEqual((next(stream), next(stream)), (1, 2))
+        with self.assertRaises(ValidationError) as context:
+            next(stream)
+        self.assertEqual(
+            str(context.exception), "'values[2]' should be type int, not str."
+        )
+        self.assertEqual((stream.seen, stream.failed), (3, 1))
+
+    def test_immediate(self):
+        self.assertRaises(ValidationError, promises, [1, 'b'], int, immediate=True)
+        stream = promises(iter([1, 2]), int, immediate=True)
+        self.assertEqual(stream.seen, 2)
+        self.assertEqual(list(stream), [1, 2])
+
+    def test_chunked(self):
+        """Only one chunk of an unbounded generator is read at a time."""
+        source = itertools.count()
+        stream = promises(source, int, immediate=True, chunk=100)
+        self.assertEqual(stream.seen, 100)
+        self.assertEqual(list(itertools.islice(stream, 150)), list(range(150)))
+        self.assertEqual(stream.seen, 200)
+        self.assertEqual(next(source), 200)
+        self.assertGreaterEqual(stream.elapsed, 0.0)
+
+    def test_chunk_failure(self):
+        with self.assertRaises(ValidationError) as context:
+            list(promises([1, 2, 3, 'd', 5], int, chunk=2))
+        self.assertEqual(
+            str(context.exception), "'object[3]' should be type int, not str."
+        )
+
+    def test_skip(self):
+        stream = promises(iter([1, 'b', 3, None]), int, chunk=3, skip=True)
+        self.assertEqual(list(stream), [1, 3])
+        self.assertEqual((stream.seen, stream.failed), (4, 2))
+
+    def test_inner_keywords(self):
+        stream = promises([[1], [2, 'b']], list, sequence=int, skip=True)
+        self.assertEqual(list(stream), [[1]])
+        self.assertRaises(ValueError, promises, [], int, chunk=0)
+
+    def test_validate_iterator(self):
+        self.assertEqual(list(validate(iter([1, 2]), object, iterator=int)), [1, 2])
+
+
+class SamplingTests(unittest.TestCase):
+    def test_sequence(self):
+        values = list(range(100))
+        values[50] = 'x'
+        sample = Sample(5, seed=1)
+        self.assertIs(validate_sequence(values, int, sample=sample), values)
+        self.assertEqual(sample.count(len(values)), 7)
+        values[-1] = 'y'
+        self.assertRaises(ValidationError, validate_sequence, values, int, sample=sample)
+        self.assertEqual(check_sequence(values, int, sample=sample).checked, 7)
+
+    def test_mapping(self):
+        mapping = dict((key, key) for key in range(100))
+        sample = Sample(3, seed=2)
+        self.assertIs(validate_mapping(mapping, (int, int), sample=sample), mapping)
+        self.assertEqual(sample.count(len(mapping)), 5)
+        mapping[list(mapping)[0]] = 'a'
+        self.assertRaises(ValidationError, validate_mapping, mapping, (int, int), sample=1)
+        self.assertEqual(check_mapping(mapping, (int, int), sample=sample).checked, 1)
+        failure = check_mapping({'k': 1}, (int, int), sample=5)
+        self.assertEqual((failure.path, failure.checked), ((MappingKey('k'), ), 1))
+
+    def test_promises(self):
+        values = [0, 'b', 'c', 3, 4, 'f', 6, 7]
+        stream = promises(values, int, chunk=4, sample=Sample(0))
+        self.assertEqual(list(stream), values)
+        self.assertEqual((stream.seen, stream.sampled), (8, 4))
+        stream = promises([0, 'b', 2, 'd', 'e', 5, 6, 'h'], int, chunk=4, sample=0, skip=True)
+        self.assertEqual(list(stream), [0, 'b', 2, 5, 6])
+        self.assertEqual(stream.failed, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
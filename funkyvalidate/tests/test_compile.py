@@ -0,0 +1,516 @@
+"""
+"""
+import unittest
+
+import collections
+import inspect
+import marshal
+import shutil
+import tempfile
+
+from funkyvalidate import onefile
+from funkyvalidate import (
+    compile, generate, validate, is_valid, check, Failure, ValidationError,
+    validate_many, is_valid_many, check_many, check_all, MappingKey, Sample,
+    Any, Union, Optional, Tuple, Nested, Record, ValueABC
+)
+
+
+class Even(object):
+    """Validator object, implementing __validate__."""
+    def validate(self, value):
+        return self.__validate__(value)
+    def __validate__(self, value):
+        if not isinstance(value, int) or value % 2:
+            raise ValidationError("'{0}' is not even.".format(value))
+        return value
+
+
+class Positive(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, int) and instance > 0
+
+
+class CompileTests(unittest.TestCase):
+    def test_cached(self):
+        self.assertIs(compile(int), compile(int))
+        self.assertIs(compile((int, str)), compile((int, str)))
+        self.assertIsNot(compile(int), compile(str))
+
+    def test_type(self):
+        plan = compile(int)
+        self.assertTrue(plan.is_valid(12))
+        self.assertFalse(plan.is_valid('12'))
+        self.assertEqual(plan.validate(12), 12)
+        with self.assertRaises(ValidationError) as context:
+            plan.validate('12', name='count')
+        self.assertEqual(
+            str(context.exception), "'count' should be type int, not str."
+        )
+
+    def test_tuple_of_types(self):
+        plan = compile((int, str))
+        self.assertTrue(plan.is_valid('a'))
+        self.assertFalse(plan.is_valid(1.5))
+        self.assertRaises(ValidationError, compile, (int, 'a'))
+
+    def test_bad_category(self):
+        self.assertRaises(TypeError, compile, 12)
+
+    def test_none(self):
+        self.assertTrue(compile(None).is_valid(object()))
+        self.assertEqual(validate(12), 12)
+
+    def test_any(self):
+        self.assertTrue(compile(Any).is_valid(None))
+
+    def test_union(self):
+        plan = compile(Optional(str))
+        self.assertTrue(plan.is_valid(None))
+        self.assertTrue(plan.is_valid('a'))
+        self.assertFalse(plan.is_valid(12))
+        self.assertTrue(compile(Union(list, tuple)).is_valid(()))
+
+    def test_tuple(self):
+        plan = compile(Tuple(str, int))
+        self.assertTrue(plan.is_valid(('a', 1)))
+        self.assertFalse(plan.is_valid(('a', 'b')))
+        self.assertFalse(plan.is_valid(('a', 1, 2)))
+        self.assertFalse(plan.is_valid(['a', 1]))
+        self.assertTrue(isinstance(('a', 1), Tuple(str, int)))
+
+    def test_nested(self):
+        plan = compile(Nested(list, Nested(tuple, str)))
+        self.assertTrue(plan.is_valid([('a', 'b'), ()]))
+        self.assertFalse(plan.is_valid([('a', 1)]))
+        self.assertFalse(plan.is_valid((('a', 'b'), )))
+
+    def test_validator(self):
+        plan = compile(Even())
+        self.assertTrue(plan.is_valid(2))
+        self.assertFalse(plan.is_valid(3))
+        self.assertEqual(plan.validate(4), 4)
+        self.assertRaises(ValidationError, plan.validate, 3)
+
+    def test_validator_instances_not_cached(self):
+        before = len(onefile._PLANS)
+        for _ in range(100):
+            validate(2, Even())
+        self.assertEqual(len(onefile._PLANS), before)
+
+    def test_bounded(self):
+        cache = onefile.PlanCache(capacity=8)
+        hot = compile(Tuple(str, int))
+        cache.add('hot', hot)
+        for i in range(100):
+            cache.add(i, onefile.Plan(i, bool))
+            hot.uses += 1
+            self.assertLessEqual(len(cache), cache.capacity)
+        self.assertIs(cache['hot'], hot)
+        self.assertGreater(cache.stats()['evictions'], 90)
+
+
+class ValidateTests(unittest.TestCase):
+    def test_inner(self):
+        self.assertEqual(validate([1, 2], list, inner=int), [1, 2])
+        with self.assertRaises(ValidationError) as context:
+            validate([1, 'b'], list, inner=int)
+        self.assertEqual(
+            str(context.exception), "'object[1]' should be type int, not str."
+        )
+        self.assertRaises(ValidationError, validate, 12, int, inner=int)
+
+    def test_is_valid(self):
+        self.assertTrue(is_valid([1, 2], list, inner=int))
+        self.assertFalse(is_valid([1, 'b'], list, inner=int))
+        self.assertFalse(is_valid(12, int, inner=int))
+        self.assertFalse(is_valid(12, (int, 'a')))
+
+
+class CheckTests(unittest.TestCase):
+    def test_valid(self):
+        self.assertIsNone(check(12, int))
+        self.assertIsNone(check([1, 2], list, inner=int))
+        self.assertIsNone(check(4, Even()))
+
+    def test_failure(self):
+        failure = check('12', int, name='count')
+        self.assertIsInstance(failure, Failure)
+        self.assertEqual(failure.value, '12')
+        self.assertEqual(failure.message, "'count' should be type int, not str.")
+        self.assertIsInstance(failure.exception(), ValidationError)
+
+    def test_inner_failure(self):
+        failure = check([1, 'b'], list, inner=int)
+        self.assertEqual(failure.name, 'object[1]')
+        self.assertEqual(failure.value, 'b')
+        self.assertEqual(check(12, int, inner=int).category.__name__, 'Iterable')
+
+    def test_validator_failure(self):
+        failure = check(3, Even())
+        self.assertEqual(failure.message, "'3' is not even.")
+
+    def test_malformed_category(self):
+        self.assertIsInstance(check(12, (int, 'a')), Failure)
+        self.assertRaises(TypeError, check, 12, 12)
+
+
+class ManyTests(unittest.TestCase):
+    def test_type_test(self):
+        """Plans which can be checked once per type of element."""
+        for category in [int, (int, str), Optional(str), Any, collections.Sequence]:
+            self.assertIsNotNone(compile(category).type_test, category)
+        for category in [Positive, (int, Positive), Tuple(int), Nested(list, int), Even()]:
+            self.assertIsNone(compile(category).type_test, category)
+
+    def test_validate_many(self):
+        values = [1, 2, True, 3]
+        self.assertIs(validate_many(values, int), values)
+        with self.assertRaises(ValidationError) as context:
+            validate_many([1, 2, 'c', 4, 'e'], int, name='values')
+        self.assertEqual(
+            str(context.exception), "'values[2]' should be type int, not str."
+        )
+        self.assertRaises(ValidationError, validate_many, 12, int)
+
+    def test_value_dependent(self):
+        self.assertTrue(is_valid_many([1, 2, 3], Positive))
+        self.assertFalse(is_valid_many([1, -2, 3], Positive))
+        self.assertEqual(check_many([1, -2, 3], Positive).name, 'object[1]')
+
+    def test_iterator(self):
+        self.assertTrue(is_valid_many(iter([1, 2]), int))
+        self.assertFalse(is_valid_many(iter([1, 'b']), int))
+        failure = check_many(iter([1, 2, 'c']), int)
+        self.assertEqual((failure.name, failure.value), ('object[2]', 'c'))
+
+    def test_nested(self):
+        self.assertTrue(isinstance(list(range(1000)), Nested(list, int)))
+        self.assertFalse(isinstance(list(range(1000)) + [None], Nested(list, int)))
+        self.assertTrue(isinstance([None, 'a'], Nested(list, Optional(str))))
+
+
+class CheckAllTests(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(check_all([1, 2], list, inner=int), [])
+        self.assertEqual(check_all([[1], [2]], Nested(list, Nested(list, int))), [])
+
+    def test_every_failure(self):
+        failures = check_all([1, 'b', 3, None], list, name='values', inner=int)
+        self.assertEqual([failure.path for failure in failures], [(1, ), (3, )])
+        self.assertEqual(failures[1].name, 'values[3]')
+        self.assertEqual(
+            [failure.message for failure in check_all(12, str, inner=int)],
+            ["'object' should be type str, not int.",
+             "'object' should be type Iterable, not int."]
+        )
+
+    def test_nested_paths(self):
+        spec = Nested(list, Nested(tuple, int))
+        failures = check_all([(1, 'a'), [2], (3, 4, 'c')], spec)
+        self.assertEqual([failure.path for failure in failures], [(0, 1), (1, ), (2, 2)])
+        self.assertEqual(failures[0].message, "'object[0][1]' should be type int, not str.")
+        self.assertEqual(failures[1].category, tuple)
+        self.assertEqual(len(check_all(iter([[1], ['b']]), None, inner=Nested(list, int))), 1)
+
+    def test_validator(self):
+        failures = check_all([2, 3, 4, 5], None, inner=Even())
+        self.assertEqual([failure.message for failure in failures], ["'3' is not even.", "'5' is not even."])
+
+    def test_lazy_names(self):
+        failure = Failure('a', int, 'record', path=(2, MappingKey('id')))
+        self.assertEqual(failure.name, "record[2] key 'id'")
+        self.assertEqual(MappingKey('id'), MappingKey('id'))
+
+
+class RecordTests(unittest.TestCase):
+    def test_dict_record(self):
+        person = Record({'id': int, 'name': str}, optional={'email': Optional(str)})
+        self.assertTrue(isinstance({'id': 1, 'name': 'a'}, person))
+        self.assertTrue(isinstance({'id': 1, 'name': 'a', 'email': None, 'age': 3}, person))
+        self.assertFalse(isinstance({'id': 1, 'name': 'a', 'email': 3}, person))
+        self.assertFalse(isinstance({'id': 1}, person))
+        self.assertFalse(isinstance({'id': -1, 'name': 2}, person))
+        self.assertFalse(isinstance([('id', 1), ('name', 'a')], person))
+        self.assertTrue(issubclass(dict, person))
+
+    def test_closed(self):
+        point = Record({'x': int, 'y': int}, closed=True)
+        self.assertTrue(is_valid({'x': 1, 'y': 2}, point))
+        self.assertFalse(is_valid({'x': 1, 'y': 2, 'z': 3}, point))
+        self.assertTrue(is_valid({'x': 1, 'y': 2}, Record({'x': int}, {'y': int}, closed=True)))
+
+    def test_key_sets(self):
+        """The verdict for a set of keys holds, whichever record brought it."""
+        spec = Record({'id': Positive})
+        plan = compile(spec)
+        records = [{'id': 1}, {'id': 2, 'extra': 0}, {'id': 3}]
+        self.assertTrue(plan.test_many(records))
+        self.assertFalse(plan.test_many(records + [{'id': 0}]))
+        self.assertFalse(plan.test({'extra': 0}))
+        self.assertTrue(plan.test({'extra': 1, 'id': 4}))
+
+    def test_tuple_record(self):
+        pair = Record((str, Even()))
+        self.assertTrue(isinstance(('a', 2), pair))
+        self.assertFalse(isinstance(('a', 3), pair))
+        self.assertFalse(isinstance(('a', 2, 4), pair))
+        self.assertTrue(isinstance((('a', 2), ('b', 4)), Record((pair, pair))))
+        self.assertEqual(
+            check(['a', 2], pair, name='pair').message,
+            "'pair' should be type Record, not list."
+        )
+
+    def test_interned(self):
+        self.assertIs(Record({'a': int}), Record({'a': int}))
+        self.assertIsNot(Record({'a': int}), Record({'a': int}, closed=True))
+        self.assertIs(Record((int, str)), Record([int, str]))
+        self.assertRaises(TypeError, Record, 12)
+        self.assertRaises(TypeError, Record, (int, ), closed=True)
+
+    def test_unhashable_fields(self):
+        class Unhashable(Even):
+            __hash__ = None
+        for record in [Record({'a': Unhashable()}), Record((Unhashable(), ))]:
+            self.assertTrue(isinstance(record, type))
+        self.assertTrue(is_valid({'a': 2}, Record({'a': Unhashable()})))
+        self.assertFalse(is_valid({'a': 3}, Record({'a': str}, optional={'b': Unhashable()})))
+
+
+class GenerateTests(unittest.TestCase):
+    def test_matches_compile(self):
+        specs = [
+            None, Any, int, (int, str), Positive, Even(), Optional(str), Union(str, Positive),
+            Tuple(str, int), Tuple(), Nested(list, int), Nested(list, Tuple(str, Positive)),
+            Nested(list, Nested(tuple, Optional(str))), Record((str, Even())),
+            Record({'id': Positive}), collections.Sequence,
+        ]
+        values = [
+            None, 1, -1, 2, True, 'a', 1.5, (), ('a', 1), ('a', 2), ('a', 1, 2), ['a', 1],
+            [], [1, 2], [1, 'b'], [('a', 1)], [('a', -1)], [('a', 'b'), ()], [(None, 'a')],
+            [[1]], {'id': 1}, {'id': 0},
+        ]
+        for spec in specs:
+            compiled, generated = compile(spec), generate(spec)
+            for value in values:
+                self.assertEqual(
+                    generated.test(value), compiled.test(value), (spec, value)
+                )
+            self.assertIs(generated.type_test is None, compiled.type_test is None)
+
+    def test_source(self):
+        plan = generate(Nested(list, Tuple(str, Positive)))
+        self.assertIs(plan, generate(Nested(list, Tuple(str, Positive))))
+        self.assertIn("for v", plan.test.source)
+        self.assertIn("len(v", plan.test.source)
+        self.assertEqual(inspect.getsource(plan.test), plan.test.source)
+        self.assertEqual(
+            plan.check([('a', 0)], name='pairs').message,
+            "'pairs' should be type Nestedlist, not list."
+        )
+        self.assertIsNone(generate(Nested(collections.Iterator, int)).check(iter([1, 2])))
+
+    def test_deep_nesting(self):
+        spec, value = Positive, 1
+        for _ in range(onefile.CODEGEN_DEPTH * 3):
+            spec, value = Nested(list, spec), [value]
+        self.assertTrue(generate(spec).test(value))
+        self.assertFalse(generate(spec).test([value, [[0]]]))
+
+
+class CodeCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        onefile.CODE_CACHE = None
+        shutil.rmtree(self.directory)
+
+    def generate(self, spec):
+        onefile._GENERATED.pop(spec, None)
+        return generate(spec)
+
+    def test_round_trip(self):
+        spec = Nested(list, Tuple(str, float))
+        cache = onefile.use_code_cache(self.directory)
+        self.assertEqual(len(cache), 0)
+        self.assertTrue(self.generate(spec).test([('a', 1.5)]))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache.save()
+
+        cache = onefile.use_code_cache(self.directory)
+        self.assertEqual(len(cache), 1)
+        plan = self.generate(spec)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertTrue(plan.test([('a', 1.5)]))
+        self.assertFalse(plan.test([('a', 1)]))
+        self.assertEqual(inspect.getsource(plan.test), plan.test.source)
+
+    def test_invalidation(self):
+        cache = onefile.use_code_cache(self.directory)
+        self.generate(Tuple(str, float))
+        cache.save()
+        with open(cache.path, 'rb') as stream:
+            codes = marshal.load(stream)[1]
+        with open(cache.path, 'wb') as stream:
+            marshal.dump((('2.0', 0), codes), stream)
+        self.assertEqual(len(onefile.CodeCache(cache.path)), 0)
+        with open(cache.path, 'wb') as stream:
+            stream.write(b'garbage')
+        self.assertEqual(len(onefile.CodeCache(cache.path)), 0)
+
+
+class DeepNestingTests(unittest.TestCase):
+    """Nested specs and values deeper than the recursion limit."""
+    depth = 3000
+
+    def deep(self, spec, value):
+        for _ in range(self.depth):
+            spec, value = Nested(list, spec), [value]
+        return spec, value
+
+    def test_valid(self):
+        spec, value = self.deep(int, 1)
+        self.assertTrue(isinstance(value, spec))
+        self.assertEqual(validate([value, value], list, inner=spec), [value, value])
+
+    def test_invalid(self):
+        spec, value = self.deep(int, 'a')
+        self.assertFalse(isinstance(value, spec))
+        self.assertFalse(isinstance([[1], 2], Nested(list, Nested(list, int))))
+        failure = check_many([self.deep(int, 1)[1], value], spec)
+        self.assertEqual(failure.name, 'object[1]')
+        self.assertEqual(failure.message, "'object[1]' should be type Nestedlist, not list.")
+
+    def test_iterators(self):
+        spec = Nested(collections.Iterator, Nested(list, int))
+        self.assertTrue(isinstance(iter([[1], [2, 3]]), spec))
+        self.assertFalse(isinstance(iter([[1], ['b']]), spec))
+
+
+class SampleTests(unittest.TestCase):
+    def test_indexes(self):
+        self.assertEqual(Sample(10).indexes(5), [0, 1, 2, 3, 4])
+        indexes = Sample(4, seed=3).indexes(1000)
+        self.assertEqual(len(indexes), 6)
+        self.assertEqual((indexes[0], indexes[-1]), (0, 999))
+        self.assertEqual(indexes, sorted(set(indexes)))
+        self.assertEqual(indexes, Sample(4, seed=3).indexes(1000))
+        self.assertRaises(ValueError, Sample, -1)
+
+    def test_stratified(self):
+        indexes = Sample(4, seed=0, stratified=True).indexes(402)
+        self.assertEqual(
+            [(index - 1) // 100 for index in indexes[1:-1]], [0, 1, 2, 3]
+        )
+
+    def test_check_many(self):
+        values = [1] * 1000
+        values[500] = -1
+        sample = Sample(3, seed=0)
+        self.assertIsNone(check_many(values, Positive, sample=sample))
+        self.assertEqual(sample.count(len(values)), 5)
+        values[-1] = -2
+        failure = check_many(values, Positive, sample=sample)
+        self.assertEqual(failure.name, 'object[999]')
+        self.assertEqual(failure.checked, 5)
+        values[0] = -3
+        self.assertEqual(check_many(values, Positive, sample=3).checked, 1)
+        self.assertIsNone(check_many(values, Positive).checked)
+        self.assertFalse(is_valid_many(iter(values), Positive, sample=2))
+        self.assertIsNotNone(check_many(values, Positive, sample=len(values)))
+
+    def test_nested(self):
+        values = list(range(1, 1000)) + [0]
+        self.assertFalse(is_valid(values, Nested(list, Positive)))
+        values[-1] = 1000
+        values[300] = 0
+        self.assertTrue(is_valid(values, Nested(list, Positive), sample=Sample(2, seed=0)))
+        self.assertEqual(validate(values, list, inner=Positive, sample=2), values)
+        self.assertRaises(
+            ValidationError, validate, (1, 2), Nested(list, Positive), sample=2
+        )
+
+
+class SerialExecutor(object):
+    """Stands in for a process pool, recording the chunks it is given."""
+    def __init__(self):
+        self.chunks = []
+
+    def map(self, function, tasks):
+        for task in tasks:
+            self.chunks.append(task[1:])
+            yield function(task)
+
+
+class ParallelTests(unittest.TestCase):
+    def setUp(self):
+        self.threshold = onefile.PARALLEL_THRESHOLD
+        onefile.PARALLEL_THRESHOLD = 4
+
+    def tearDown(self):
+        onefile.PARALLEL_THRESHOLD = self.threshold
+
+    def test_chunks(self):
+        executor = SerialExecutor()
+        self.assertIsNone(check_many([1, 2, 3, 4, 5], Positive, executor=executor, chunksize=2))
+        self.assertEqual(executor.chunks, [(0, [1, 2]), (2, [3, 4]), (4, [5])])
+
+    def test_failure_matches_serial(self):
+        values = [2, 4, 6, 7, 8, 9]
+        failure = check_many(values, Even(), name='values',
+                             executor=SerialExecutor(), chunksize=2)
+        self.assertEqual(failure.name, 'values[3]')
+        self.assertEqual(failure.message, check_many(values, Even(), name='values').message)
+
+    def test_serial_fallback(self):
+        executor = SerialExecutor()
+        self.assertIsNone(check_many([1, 2], Positive, executor=executor))
+        self.assertIsNone(check_many(list(range(10)), int, executor=executor))
+        self.assertEqual(executor.chunks, [])
+
+    def test_nested(self):
+        category = Nested(list, Positive)
+        self.assertTrue(is_valid([1, 2, 3, 4], category, executor=SerialExecutor()))
+        self.assertFalse(is_valid([1, 2, -3, 4], category, executor=SerialExecutor()))
+        self.assertFalse(is_valid(12, Nested(int, Positive), executor=SerialExecutor()))
+        with self.assertRaises(ValidationError) as context:
+            validate((1, 2, 3, 4), category, executor=SerialExecutor())
+        self.assertEqual(
+            str(context.exception),
+            "'object' should be type Nestedlist, not tuple."
+        )
+
+    def test_workers(self):
+        values = list(range(1, 50))
+        self.assertEqual(validate(values, list, inner=Positive, workers=2), values)
+        failure = check_many(values + [0] + values, Positive, workers=2, chunksize=7)
+        self.assertEqual(failure.name, 'object[49]')
+
+    def test_workers_generated_specs(self):
+        pairs = [(1, 'a')] * 20
+        self.assertIsNone(check_many(pairs, Tuple(int, str), workers=2))
+        failure = check_many(pairs + [(1, 2)], Tuple(int, str), workers=2)
+        self.assertEqual(failure.name, 'object[20]')
+        records = [{'id': (i, None)} for i in range(1, 20)]
+        spec = Record({'id': Tuple(Positive, Optional(str))})
+        self.assertIsNone(check_many(records, spec, workers=2))
+        self.assertIsNotNone(check_many(records + [{'id': (0, None)}], spec, workers=2))
+        self.assertFalse(is_valid([[1, 2]] * 10 + [[-1]], list, inner=Nested(list, Positive), workers=2))
+
+    def test_unpicklable_category(self):
+        local = Nested(list, type('Local', (object, ), {}))
+        executor = SerialExecutor()
+        self.assertIsNone(check_many([[]] * 10, local, executor=executor))
+        self.assertEqual(executor.chunks, [])
+
+    def test_portable(self):
+        for spec in [Tuple(int, str), Optional(Positive), Nested(list, Union(int, str)),
+                     Record({'a': Tuple(int)}, optional={'b': str}, closed=True),
+                     Record((Nested(tuple, int), Any)), (int, str), Positive]:
+            self.assertEqual(onefile._rebuild(onefile._portable(spec)), spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from funkyvalidate.examples.existing_directory import ExistingDirectory
+from funkyvalidate.examples.existing_file import ExistingFile
+from funkyvalidate import check_many, validate_many, is_valid_many
+from funkyvalidate.examples import filesystem
+from funkyvalidate.examples.filesystem import FilesystemIndex, kinds, FILE, DIRECTORY
+
+
+def touch(*parts):
+    with open(os.path.join(*parts), 'w'):
+        pass
+
+
+class FilesystemIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'a', 'b'))
+        touch(self.root, 'top.txt')
+        touch(self.root, 'a', 'b', 'deep.txt')
+        self.index = FilesystemIndex(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_kinds(self):
+        self.assertEqual(self.index.kind(self.path('top.txt')), FILE)
+        self.assertEqual(self.index.kind(self.path('a', 'b')), DIRECTORY)
+        self.assertTrue(self.index.isfile(self.path('a', 'b', 'deep.txt')))
+        self.assertFalse(self.index.isdir(self.path('top.txt')))
+        self.assertFalse(self.index.exists(self.path('a', 'missing.txt')))
+        self.assertTrue(self.index.isdir(self.root))
+        self.assertEqual(self.index.scans, 3)
+
+    def test_trailing_separator(self):
+        for path in [self.path('top.txt', ''), self.path('a', ''), '']:
+            self.assertEqual(self.index.isfile(path), os.path.isfile(path))
+            self.assertEqual(self.index.isdir(path), os.path.isdir(path))
+        self.assertIsNone(self.index.kind(self.path('top.txt', '')))
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "requires symlinks")
+    def test_parent_of_symlink(self):
+        os.symlink(self.path('a', 'b'), self.path('link'))
+        # link/.. is a/, not the root
+        for path in [self.path('link', os.pardir, 'top.txt'),
+                     self.path('link', os.pardir, 'b', 'deep.txt')]:
+            self.assertEqual(self.index.isfile(path), os.path.isfile(path))
+        self.assertFalse(self.index.exists(self.path('link', os.pardir, 'top.txt')))
+        self.assertTrue(self.index.isfile(self.path('a', os.pardir, 'top.txt')))
+
+    def test_negative_cache(self):
+        missing = self.path('nonexistant', 'file.txt')
+        self.assertFalse(self.index.exists(missing))
+        os.mkdir(self.path('nonexistant'))
+        touch(missing)
+        self.assertFalse(self.index.exists(missing))
+        self.index.refresh()
+        self.assertTrue(self.index.isfile(missing))
+
+    def test_incremental_refresh(self):
+        self.index.refresh()
+        self.assertEqual(self.index.scans, 3)
+
+        # Ensure the change is visible at coarse mtime resolution
+        time.sleep(0.01)
+        touch(self.root, 'a', 'new.txt')
+        os.utime(self.path('a'), (time.time() + 10, time.time() + 10))
+        self.index.refresh()
+        self.assertEqual(self.index.scans, 4)
+        self.assertTrue(self.index.isfile(self.path('a', 'new.txt')))
+
+        shutil.rmtree(self.path('a', 'b'))
+        os.utime(self.path('a'), (time.time() + 20, time.time() + 20))
+        self.index.refresh()
+        self.assertFalse(self.index.exists(self.path('a', 'b', 'deep.txt')))
+
+    def test_existing_classes(self):
+        ExistingFile.filesystem = ExistingDirectory.filesystem = self.index
+        try:
+            self.assertTrue(isinstance(self.path('top.txt'), ExistingFile))
+            self.assertFalse(isinstance(self.path('a'), ExistingFile))
+            self.assertTrue(isinstance(self.path('a'), ExistingDirectory))
+            self.assertEqual(ExistingFile(self.path('top.txt')), self.path('top.txt'))
+            self.assertRaises(IOError, ExistingDirectory, self.path('top.txt'))
+        finally:
+            ExistingFile.filesystem = ExistingDirectory.filesystem = os.path
+
+
+class CheckManyTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.root, 'sub'))
+        self.files = [os.path.join(self.root, str(i)) for i in range(20)]
+        for path in self.files:
+            touch(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_kinds(self):
+        paths = self.files + [
+            os.path.join(self.root, 'sub'), os.path.join(self.root, 'missing'),
+            os.path.join(self.root, 'sub', ''), os.path.join(self.root, 'sub', 'missing')
+        ]
+        expected = [FILE] * 20 + [DIRECTORY, None, DIRECTORY, None]
+        self.assertEqual(kinds(paths), expected)
+        self.assertEqual(kinds(paths, threshold=1000), expected)
+
+    def test_check_many(self):
+        paths = [self.files[0], os.path.join(self.root, 'sub'), 12, 'missing']
+        self.assertEqual(ExistingFile._check_many_(paths), [True, False, False, False])
+        self.assertEqual(ExistingDirectory._check_many_(paths), [False, True, False, False])
+        self.assertEqual(check_many(paths, ExistingFile, name='paths').name, 'paths[1]')
+        self.assertEqual(check_many(paths[1:], ExistingDirectory).value, 12)
+        self.assertIsNone(check_many(iter(self.files), ExistingFile))
+        self.assertIs(validate_many(self.files, ExistingFile), self.files)
+        self.assertTrue(is_valid_many(self.files, ExistingFile))
+        self.assertFalse(is_valid_many(paths, ExistingDirectory))
+
+    def test_check_many_in_bulk(self):
+        stat_kind = filesystem.stat_kind
+        stats = []
+        def counted(path):
+            stats.append(path)
+            return stat_kind(path)
+        filesystem.stat_kind = counted
+        try:
+            self.assertIsNone(check_many(self.files, ExistingFile))
+        finally:
+            filesystem.stat_kind = stat_kind
+        if filesystem._scandir is not None:
+            self.assertEqual(stats, [])
+        else:
+            self.assertEqual(len(stats), len(self.files))
+
+    def test_check_many_with_index(self):
+        ExistingFile.filesystem = FilesystemIndex(self.root)
+        try:
+            self.assertEqual(ExistingFile._check_many_(self.files[:2] + [self.root]), [True, True, False])
+            self.assertEqual(check_many(self.files[:2] + [self.root], ExistingFile).value, self.root)
+        finally:
+            ExistingFile.filesystem = os.path
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Import time of the package, measured in fresh interpreters.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+
+package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds 'import funkyvalidate' may take. Loading onefile takes several
+# milliseconds; the lazy package module alone, well under one.
+IMPORT_BUDGET = 0.002
+
+# Slow imports which onefile only makes when they are needed
+DEFERRED_MODULES = ('funkyvalidate.onefile', 'six', 'multiprocessing', 'tempfile', 'random')
+
+
+def run(statements):
+    """
+    Output of `statements`, run by a fresh interpreter.
+    @type: statements: str
+    @rtype: str
+    """
+    return subprocess.check_output(
+        [sys.executable, '-c', statements], cwd=package_dir
+    ).decode('ascii').strip()
+
+
+class ImportTests(unittest.TestCase):
+    def test_lazy(self):
+        loaded = run(str.format(
+            "import sys, funkyvalidate; print(sorted(set({0!r}) & set(sys.modules)))",
+            DEFERRED_MODULES
+        ))
+        self.assertEqual(loaded, '[]')
+        self.assertEqual(
+            run("import funkyvalidate; print(funkyvalidate.Nested.__module__)"),
+            'funkyvalidate.onefile'
+        )
+        loaded = run(str.format(
+            "import sys, funkyvalidate.onefile; print(sorted(set({0!r}[2:]) & set(sys.modules)))",
+            DEFERRED_MODULES
+        ))
+        self.assertEqual(loaded, '[]')
+
+    def test_import_time(self):
+        # Best of several, so one slow start does not fail the test
+        elapsed = min(
+            float(run(
+                "import timeit; start = timeit.default_timer(); import funkyvalidate; "
+                "print(timeit.default_timer() - start)"
+            ))
+            for _ in range(3)
+        )
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+    def test_names(self):
+        import funkyvalidate
+        from funkyvalidate import onefile
+        self.assertIs(funkyvalidate.validate, onefile.validate)
+        self.assertIn('Nested', funkyvalidate.__all__)
+        self.assertIn('validate', dir(funkyvalidate))
+        self.assertRaises(AttributeError, getattr, funkyvalidate, 'missing')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+"""
+import abc
+import threading
+import unittest
+
+from funkyvalidate import onefile
+from funkyvalidate import (
+    instrument, stats, validate, meets, compile, ValueABC, CheckerMeta, InterfaceType,
+    ValidationError
+)
+from funkyvalidate.clever_validate import promises
+from funkyvalidate.examples.examples import PositiveInteger
+
+
+class Positive(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, int) and instance > 0
+
+
+class Named(InterfaceType):
+    name = abc.abstractproperty()
+
+class Person(object):
+    name = 'a'
+
+
+class InstrumentTests(unittest.TestCase):
+    def test_hooks(self):
+        with instrument():
+            validate(1, Positive)
+            self.assertRaises(ValidationError, validate, -1, Positive)
+            self.assertTrue(isinstance(2, Positive))
+            self.assertTrue(meets(Person(), Named))
+            self.assertFalse(meets(object(), Named))
+            list(promises([1, 2, 3], int, chunk=2))
+        specs = stats()['specs']
+        self.assertEqual(specs[Positive]['validate']['checks'], 2)
+        self.assertEqual(specs[Positive]['validate']['failures'], 1)
+        # validate() checks through isinstance, too
+        self.assertEqual(specs[Positive]['isinstance']['checks'], 3)
+        self.assertEqual(specs[Named]['meets']['failures'], 1)
+        self.assertEqual(specs[int]['promises']['checks'], 3)
+        summary = specs[Positive]['isinstance']
+        self.assertTrue(0 < summary['p50'] <= summary['p99'])
+        self.assertTrue(summary['total'] > 0)
+
+    def test_valuemeta_module(self):
+        with instrument():
+            self.assertTrue(isinstance(5, PositiveInteger))
+            self.assertFalse(isinstance(-5, PositiveInteger))
+        specs = stats()['specs']
+        self.assertEqual(specs[PositiveInteger]['isinstance']['checks'], 2)
+        self.assertEqual(specs[PositiveInteger]['isinstance']['failures'], 1)
+
+    def test_disabled(self):
+        instancecheck = CheckerMeta.__dict__['__instancecheck__']
+        with instrument():
+            with instrument():
+                self.assertIsNot(CheckerMeta.__dict__['__instancecheck__'], instancecheck)
+            self.assertIsNotNone(onefile.active_recorder())
+        self.assertIs(CheckerMeta.__dict__['__instancecheck__'], instancecheck)
+        self.assertIsNone(onefile.active_recorder())
+        isinstance(1, Positive)
+        self.assertEqual(stats()['specs'], {})
+
+    def test_threads(self):
+        def work():
+            for value in range(1000):
+                isinstance(value, Positive)
+        with instrument():
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(stats()['specs'][Positive]['isinstance']['checks'], 4000)
+        self.assertEqual(stats()['specs'][Positive]['isinstance']['failures'], 4)
+
+    def test_caches(self):
+        meets(Person(), Named)
+        meets(Person(), Named)
+        compile(Positive)
+        compile(Positive)
+        caches = stats()['caches']
+        self.assertIn('hit_rate', caches['specs'])
+        for name in ['plans', 'generated', 'meets']:
+            self.assertIn('count', caches[name])
+            self.assertTrue(0.0 <= caches[name]['hit_rate'] <= 1.0)
+        for name in ['plans', 'meets']:
+            self.assertGreater(caches[name]['hits'], 0)
+            self.assertGreater(caches[name]['hit_rate'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 import abc
+import gc
+import weakref
 
 from funkyvalidate import is_abstract_method, has_concrete_method, missing_abstracts, meets
+from funkyvalidate import onefile
+from funkyvalidate import InterfaceType
 
 
 # Support object
@@ -63,5 +67,83 @@ class MeetsTests(unittest.TestCase):
         self.assertTrue(not meets(NotAValidator, ValidatorInterface))
 
 
+class Named(object):
+    __metaclass__ = abc.ABCMeta
+    name = abc.abstractproperty(lambda self: NotImplemented)
+
+class Slotted(object):
+    __slots__ = ('name', )
+
+class Dynamic(object):
+    def __getattr__(self, attr):
+        if attr == 'name':
+            return 'dynamic'
+        raise AttributeError(attr)
+
+
+class MeetsCacheTests(unittest.TestCase):
+    """
+    meets() caches per class; these check the cases where an instance
+    differs from its class.
+    """
+    def test_instance_dict(self):
+        class Record(object):
+            pass
+        first, second = Record(), Record()
+        second.name = 'second'
+        self.assertFalse(meets(first, Named))
+        self.assertTrue(meets(second, Named))
+        self.assertFalse(meets(first, Named))
+        second.name = abc.abstractmethod(lambda self: NotImplemented)
+        self.assertFalse(meets(second, Named))
+
+    def test_slots(self):
+        slotted = Slotted()
+        self.assertTrue(meets(Slotted, Named))
+        self.assertFalse(meets(slotted, Named))
+        slotted.name = 'slotted'
+        self.assertTrue(meets(slotted, Named))
+
+    def test_getattr(self):
+        self.assertFalse(meets(Dynamic, Named))
+        self.assertTrue(meets(Dynamic(), Named))
+
+    def test_builtins(self):
+        self.assertFalse(meets(12, Named))
+        self.assertFalse(meets({'name': 'dict'}, Named))
+
+    def test_weak_references(self):
+        class Temporary(object):
+            name = 'temporary'
+        self.assertTrue(meets(Temporary(), Named))
+        self.assertTrue(meets(Temporary, Named))
+        reference = weakref.ref(Temporary)
+        del Temporary
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_clear(self):
+        class Mutable(object):
+            name = 'mutable'
+        self.assertTrue(meets(Mutable(), Named))
+        Mutable.name = abc.abstractmethod(lambda self: NotImplemented)
+        onefile.clear_meets_cache()
+        self.assertFalse(meets(Mutable(), Named))
+
+    def test_patched_later(self):
+        """Classes failing an interface may gain its methods later."""
+        class Late(object):
+            pass
+        class LateInterface(InterfaceType):
+            name = abc.abstractproperty()
+        self.assertFalse(meets(Late(), Named))
+        self.assertFalse(meets(Late, Named))
+        self.assertFalse(isinstance(Late(), LateInterface))
+        Late.name = 'late'
+        self.assertTrue(meets(Late(), Named))
+        self.assertTrue(meets(Late, Named))
+        self.assertTrue(isinstance(Late(), LateInterface))
+
+
 if __name__ == "__main__":
     unittest.main()
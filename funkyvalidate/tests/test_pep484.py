@@ -1,9 +1,15 @@
 """
 """
+import gc
 import unittest
 import collections
+import weakref
 
-from funkyvalidate import Any, Union, UnionMeta
+from funkyvalidate import (
+    Any, Union, UnionMeta, Optional, Tuple, Nested, ValueABC, SPECS, compile
+)
+from funkyvalidate import onefile
+from funkyvalidate.nested import Nested as NestedABC
 
 class MyClass(object):
     pass
@@ -155,6 +161,123 @@ class TargetedTestCase(unittest.TestCase):
     #     self.assertTrue(issubclass(combined, Union(list, tuple, )))
 
 
+class Negative(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, int) and instance < 0
+
+    @classmethod
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, int)
+
+
+class PlainTypesTestCase(unittest.TestCase):
+    """
+    Plain members are checked with one isinstance(), before value-dependent ones.
+    """
+    def test_split(self):
+        mixed = Union(str, Negative, collections.Sequence)
+        self.assertEqual(set(mixed._plain_types), set([str, collections.Sequence]))
+        self.assertEqual(mixed._value_types, (Negative, ))
+        self.assertEqual(Optional(str)._value_types, ())
+
+    def test_mixed(self):
+        mixed = Union(str, Negative)
+        self.assertTrue(isinstance('a', mixed))
+        self.assertTrue(isinstance(-1, mixed))
+        self.assertFalse(isinstance(1, mixed))
+        self.assertTrue(issubclass(bool, mixed))
+        self.assertFalse(issubclass(float, mixed))
+
+    def test_bare(self):
+        self.assertFalse(isinstance(12, Union))
+        self.assertTrue(isinstance(12, collections.Hashable))
+
+    def test_collections_abcs(self):
+        """Unions are Sets, but their members should not become Iterable."""
+        class Member(object):
+            pass
+        Union(Member, str)
+        self.assertFalse(issubclass(Member, collections.Iterable))
+        self.assertFalse(isinstance(Member(), collections.Set))
+
+    def test_tuple_collections_abcs(self):
+        """Tuple specs are Sets too, and must not break checks on tuples."""
+        spec = Tuple(int, str)
+        self.assertFalse(isinstance((1, 'a'), collections.Set))
+        self.assertFalse(issubclass(tuple, collections.MutableSet))
+        self.assertTrue(issubclass(tuple, collections.Sequence))
+        self.assertFalse(issubclass(tuple, spec))
+        self.assertTrue(issubclass(Tuple(bool, str), spec))
+        self.assertFalse(issubclass(Tuple(int), spec))
+        self.assertTrue(isinstance((1, 'a'), spec))
+
+
+class InterningTestCase(unittest.TestCase):
+    """
+    Equal specs are the identical class.
+    """
+    def test_union(self):
+        self.assertIs(Union(int, str), Union(str, int))
+        self.assertIs(Optional(str), Union(None, str))
+        self.assertIsNot(Union(int, str), Union(int, float))
+
+    def test_tuple(self):
+        self.assertIs(Tuple(int, str), Tuple(int, str))
+        self.assertIsNot(Tuple(int, str), Tuple(str, int))
+
+    def test_nested(self):
+        spec = Nested(list, Nested(tuple, Optional(str)))
+        self.assertIs(spec, Nested(list, Nested(tuple, Optional(str))))
+        self.assertIsNot(spec, Nested(tuple, Nested(tuple, Optional(str))))
+        self.assertIs(NestedABC.inherit(list, int), NestedABC(list, int))
+
+    def test_unused_specs_released(self):
+        """Beyond the most recently used, specs are only held weakly."""
+        capacity = SPECS.capacity
+        SPECS.capacity = 2
+        try:
+            spec = Union(MyClass, MyTuple)
+            reference = weakref.ref(spec)
+            self.assertIs(compile(spec).category, spec)
+            Tuple(MyClass)
+            Tuple(MyTuple)
+            del spec
+            gc.collect()
+            # Its Plan is unused since it was built
+            self.assertIsNotNone(reference())
+            onefile._PLANS._sweep()
+            gc.collect()
+            self.assertIsNone(reference())
+        finally:
+            SPECS.capacity = capacity
+
+    def test_used_plans_kept(self):
+        """Plans in use are kept, however long ago their spec was interned."""
+        capacity, plans = SPECS.capacity, onefile._PLANS
+        SPECS.capacity, onefile._PLANS = 16, onefile.PlanCache(capacity=16)
+        try:
+            hot = Nested(list, Tuple(str, MyClass))
+            plan = compile(hot)
+            for i in range(200):
+                compile(Union(MyClass, type('Churn', (object, ), {})))
+                self.assertTrue(compile(hot).is_valid([]))
+            self.assertIs(compile(hot), plan)
+            self.assertLessEqual(len(onefile._PLANS), 16)
+        finally:
+            SPECS.capacity, onefile._PLANS = capacity, plans
+
+    def test_stats(self):
+        before = SPECS.stats()
+        Tuple(MyClass, MyClass)
+        Tuple(MyClass, MyClass)
+        after = SPECS.stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertGreater(after['nbytes'], 0)
+        self.assertLessEqual(after['recent'], after['capacity'])
+        self.assertIn('count', after)
+
+
 # class ReverseTestCase(unittest.TestCase):
 #     def test_basic(self):
 #         combined = Union(list, tuple)
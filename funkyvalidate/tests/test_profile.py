@@ -0,0 +1,136 @@
+"""
+"""
+import collections
+import time
+import unittest
+
+import six
+
+from funkyvalidate import onefile
+from funkyvalidate import (
+    profile, Profile, compile, validate, check, ValidationError, ValueABC,
+    Union, Tuple, Nested, Record
+)
+
+
+class Counted(ValueABC):
+    calls = 0
+    @classmethod
+    def __instancecheck__(cls, instance):
+        Counted.calls += 1
+        return isinstance(instance, int)
+
+
+class Slow(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        time.sleep(0.001)
+        return isinstance(instance, int)
+
+
+def stacks(profiler):
+    """Collapsed stacks, by path."""
+    return dict(line.rsplit(" ", 1) for line in profiler.collapsed())
+
+
+class ProfileTests(unittest.TestCase):
+    def test_attribution(self):
+        profiler = Profile()
+        spec = Nested(list, Tuple(str, Union(str, Slow)))
+        profiler.trace('validate', compile(spec), [('a', 1), ('b', 'c'), ('d', 2)])
+        found = stacks(profiler)
+        item = "validate;Nestedlist;[i] Tuple(str, Union(Slow, str))"
+        slow = item + ";[1] Union(Slow, str);Slow"
+        self.assertIn(slow, found)
+        self.assertIn(item + ";[0] str", found)
+        # Each Slow check sleeps 1ms; there are two
+        self.assertTrue(int(found[slow]) >= 2000, found[slow])
+        self.assertTrue(all(int(elapsed) >= 0 for elapsed in found.values()))
+        self.assertEqual(profiler.samples, 1)
+
+    def test_records(self):
+        profiler = Profile()
+        profiler.trace('check', compile(Record({'id': Slow})), {'id': 1})
+        self.assertIn("check;Record;['id'] Slow", stacks(profiler))
+
+    def test_dump(self):
+        profiler = Profile()
+        profiler.trace('validate', compile(int), 1)
+        stream = six.StringIO()
+        profiler.dump(stream)
+        self.assertEqual(stream.getvalue().splitlines(), profiler.collapsed())
+        self.assertTrue(stream.getvalue().startswith("validate;int "))
+
+    def test_running(self):
+        spec = Nested(list, Slow)
+        with profile(interval=0.001) as profiler:
+            deadline = time.time() + 5
+            while profiler.samples < 2 and time.time() < deadline:
+                validate([1, 2], spec)
+                self.assertIsNotNone(check([1, 'b'], spec))
+            self.assertRaises(ValidationError, validate, ['a'], spec)
+        self.assertTrue(profiler.samples >= 2)
+        self.assertIsNone(onefile._PROFILER)
+
+    def test_overhead(self):
+        spec = Nested(list, Tuple(int, Union(int, str)))
+        value = [(i, 'x') for i in range(20000)]
+        start = time.time()
+        validate(value, spec)
+        untraced = time.time() - start
+        # Past PROFILE_ELEMENTS, elements are checked as without the trace
+        profiler = Profile()
+        start = time.time()
+        profiler.trace('validate', compile(spec), value)
+        self.assertTrue(time.time() - start < 3 * untraced + 0.01)
+        self.assertIn("validate;Nestedlist;[i] Tuple(int, Union(int, str));[0] int", stacks(profiler))
+
+        with profile(interval=0.001) as profiler:
+            start = time.time()
+            while time.time() - start < 0.5:
+                validate(value, spec)
+            wall = time.time() - start
+        self.assertTrue(profiler.samples >= 1)
+        # Each trace is followed by enough untraced time to keep to the budget
+        self.assertTrue(profiler.elapsed - profiler._last <= onefile.PROFILE_BUDGET * wall,
+                        (profiler.elapsed, profiler.samples, wall))
+
+    def armed(self):
+        """The next validate() or check() is traced."""
+        profiler = Profile()
+        onefile._PROFILER = profiler
+        self.addCleanup(setattr, onefile, '_PROFILER', None)
+        return profiler
+
+    def test_iterators(self):
+        spec = Nested(collections.Iterable, int)
+        profiler = self.armed()
+        self.assertIsNotNone(check((x for x in [1, 'a']), spec))
+        self.assertEqual(profiler.samples, 1)
+        self.armed()
+        self.assertRaises(ValidationError, validate, (x for x in [1, 'a']), spec)
+        self.armed()
+        self.assertIsNone(check((x for x in [1, 2]), spec))
+        self.assertIsNone(onefile._PROFILER)
+
+    def test_predicates_run_once(self):
+        Counted.calls = 0
+        self.armed()
+        self.assertEqual(validate([1, 2, 3], Nested(list, Counted)), [1, 2, 3])
+        self.assertEqual(Counted.calls, 3)
+        self.armed()
+        self.assertEqual(check([1, 'b'], Nested(list, Counted)).name, 'object')
+        self.assertEqual(Counted.calls, 5)
+
+    def test_deep(self):
+        spec, value = int, 1
+        for _ in range(onefile.PROFILE_DEPTH * 2):
+            spec, value = Nested(list, spec), [value]
+        profiler = Profile()
+        profiler.trace('validate', compile(spec), value)
+        depth = max(len(line.split(";")) for line in profiler.collapsed())
+        self.assertEqual(depth, onefile.PROFILE_DEPTH + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
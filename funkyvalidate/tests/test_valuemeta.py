@@ -0,0 +1,85 @@
+"""
+"""
+import unittest
+
+import six
+
+from funkyvalidate import onefile
+from funkyvalidate import ValueMeta, ValueABC
+
+
+class Positive(ValueABC):
+    @classmethod
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, int) and instance > 0
+
+    @classmethod
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, int)
+
+class Small(Positive):
+    pass
+
+@six.add_metaclass(ValueMeta)
+class Plain(object):
+    pass
+
+
+class ValueMetaTests(unittest.TestCase):
+    def test_user_checkers(self):
+        self.assertTrue(isinstance(3, Positive))
+        self.assertFalse(isinstance(-3, Positive))
+        self.assertTrue(issubclass(bool, Positive))
+        self.assertFalse(issubclass(str, Positive))
+
+    def test_fallback_checkers(self):
+        self.assertTrue(isinstance(Plain(), Plain))
+        self.assertFalse(isinstance(3, Plain))
+        self.assertFalse(issubclass(int, Plain))
+
+    def test_resolved_at_creation(self):
+        """isinstance should not have to search the __mro__ per call."""
+        original = onefile._hasattr
+        def fail(C, attr):
+            raise AssertionError("_hasattr called for {0}".format(attr))
+        onefile._hasattr = fail
+        try:
+            self.assertTrue(isinstance(3, Small))
+            self.assertTrue(isinstance(Plain(), Plain))
+        finally:
+            onefile._hasattr = original
+
+    def test_mutation_invalidates(self):
+        class Base(ValueABC):
+            @classmethod
+            def __instancecheck__(cls, instance):
+                return instance == 'base'
+        class Child(Base):
+            pass
+        self.assertTrue(isinstance('base', Child))
+
+        Base.__instancecheck__ = classmethod(lambda cls, instance: instance == 'new')
+        self.assertTrue(isinstance('new', Base))
+        self.assertTrue(isinstance('new', Child))
+        self.assertFalse(isinstance('base', Child))
+
+        Child.__instancecheck__ = classmethod(lambda cls, instance: True)
+        self.assertTrue(isinstance('base', Child))
+        del Child.__instancecheck__
+        self.assertFalse(isinstance('base', Child))
+
+    def test_plain_base_mutation(self):
+        class Mixin(object):
+            pass
+        @six.add_metaclass(ValueMeta)
+        class Child(Mixin):
+            pass
+        self.assertFalse(isinstance(3, Child))
+        Mixin.__instancecheck__ = classmethod(lambda cls, instance: True)
+        self.assertTrue(isinstance(3, Child))
+        del Mixin.__instancecheck__
+        self.assertFalse(isinstance(3, Child))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,7 +22,9 @@ import os
 
 import six
 
-class ValueMeta(abc.ABCMeta):
+from .onefile import CheckerMeta
+
+class ValueMeta(CheckerMeta):
     """
     Classes inheriting from ValueABC should be used for type hinting,
     annotations, and sometimes type-checking.
@@ -41,20 +43,11 @@ class ValueMeta(abc.ABCMeta):
     @todo: Determine: Will ValueABC.__instancecheck__ classmethod will disrupt the ValueMeta.__instancecheck__ ?
     """
 
-    def __instancecheck__(cls, instance):
-        if _hasattr(cls, '__instancecheck__'):
-            #if (cls.__instancecheck__ == ValueMeta.__instancecheck__):
-            return cls.__instancecheck__(instance)
-        else:
-            return is_ancestor(cls, type(instance))
-            #return abc.ABCMeta.__instancecheck__(cls, instance)
+    def _default_instancecheck(cls, instance):
+        return _is_ancestor_of_type(cls, instance)
 
-    def __subclasscheck__(cls, subclass):
-        if _hasattr(cls, '__subclasscheck__'):
-            return cls.__subclasscheck__(subclass)
-        else:
-            return is_ancestor(cls, subclass)
-            #return abc.ABCMeta.__subclasscheck__(cls, subclass)
+    def _default_subclasscheck(cls, subclass):
+        return is_ancestor(cls, subclass)
 
 
 def _hasattr(C, attr):
@@ -74,6 +67,9 @@ class abstractclassmethod(classmethod):
 
 
 
+def _is_ancestor_of_type(cls, instance):
+    return is_ancestor(cls, type(instance))
+
 def is_ancestor(cls, subclass):
     """
     @type: cls: type